@@ -3,16 +3,35 @@ Centralized application configuration.
 Loads settings from .env file via Pydantic BaseSettings.
 
 Usage:
-    from config import settings
+    from config import get_settings
+    settings = get_settings()
     print(settings.app_version)
 """
 import logging
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import List
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
+# Directory containing this module (api/); relative paths in settings resolve here
+_API_DIR = Path(__file__).parent
+_SCAN_INDEX_DIR = Path.home() / ".media_organizer"
+
+_LOG_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
+def _split_origins(value: str) -> List[str]:
+    """Split a comma-separated list, stripping each entry once and dropping empties."""
+    return [o for part in value.split(",") if (o := part.strip())]
+
 
 class Settings(BaseSettings):
     """
@@ -38,27 +57,50 @@ class Settings(BaseSettings):
     gemini_model: str = Field("gemini-2.0-flash", description="Gemini model name")
     thumbnail_max_size: int = Field(512, description="Max thumbnail dimension in pixels")
     chroma_db_path: str = Field(".chromadb", description="Path for ChromaDB persistent storage")
+    thumbnail_cache_mb: int = Field(256, description="Disk budget for cached thumbnails in MB (0 disables)")
+
+    # ── Scanning ─────────────────────────────────────────────────
+    scan_index_path: str = Field(
+        "",
+        description="Opt-in SQLite file caching per-folder extension stats for Analyze (empty disables; "
+                    "relative paths go under ~/.media_organizer)"
+    )
 
     # ── Helpers ──────────────────────────────────────────────────
-    @property
+    @cached_property
     def cors_origin_list(self) -> List[str]:
-        """Parse comma-separated CORS_ORIGINS into a list."""
-        return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
+        """Parse comma-separated CORS_ORIGINS into a list (computed once)."""
+        return _split_origins(self.cors_origins)
+
+    @cached_property
+    def log_level_int(self) -> int:
+        """Numeric logging level for LOG_LEVEL (falls back to INFO)."""
+        return _LOG_LEVEL_MAP.get(self.log_level.upper(), logging.INFO)
 
     @property
     def is_production(self) -> bool:
         return self.app_env == "production"
 
-    @property
+    @cached_property
     def resolved_chroma_path(self) -> str:
-        """Resolve ChromaDB path relative to the api/ directory."""
+        """Resolve ChromaDB path relative to the api/ directory (computed once)."""
         p = Path(self.chroma_db_path)
         if not p.is_absolute():
-            p = Path(__file__).parent / p
+            p = _API_DIR / p
+        return str(p)
+
+    @cached_property
+    def resolved_scan_index_path(self) -> str:
+        """Resolve the scan index path outside the source tree, under ~/.media_organizer ("" if disabled)."""
+        if not self.scan_index_path:
+            return ""
+        p = Path(self.scan_index_path).expanduser()
+        if not p.is_absolute():
+            p = _SCAN_INDEX_DIR / p
         return str(p)
 
     model_config = {
-        "env_file": str(Path(__file__).parent.parent / ".env"),
+        "env_file": str(_API_DIR.parent / ".env"),
         "env_file_encoding": "utf-8",
         "case_sensitive": False,
         "extra": "ignore",
@@ -66,14 +108,34 @@ class Settings(BaseSettings):
 
 
 # ── Singleton ────────────────────────────────────────────────────
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the Settings singleton on first use (reads .env once)."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep `from config import settings` working without eager construction.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# ── Configure root logger based on settings ──────────────────────
-logging.basicConfig(
-    level=getattr(logging, settings.log_level.upper(), logging.INFO),
-    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
 
-logger = logging.getLogger("Config")
-logger.info(f"Environment: {settings.app_env} | Version: {settings.app_version}")
+# ── Logging ──────────────────────────────────────────────────────
+_logging_configured = False
+
+
+def configure_logging(settings: Settings) -> None:
+    """Configure the root logger from settings. Call once from the entrypoint."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    logging.basicConfig(
+        level=settings.log_level_int,
+        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    _logging_configured = True
+    logging.getLogger("Config").info(
+        f"Environment: {settings.app_env} | Version: {settings.app_version}"
+    )
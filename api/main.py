@@ -1,56 +1,109 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from routers import media, android, files, analysis, jobs, ai
-from config import settings
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from routers import media, android, files, analysis, jobs
+from config import get_settings, configure_logging
 from pathlib import Path
+import orjson
+import logging
+
+settings = get_settings()
+configure_logging(settings)
 
 app = FastAPI(
     title="Mobile Media Organizer API",
     description="API to control file organization tasks with real-time progress tracking.",
     version=settings.app_version,
-    docs_url="/docs" if not settings.is_production else None,
-    redoc_url="/redoc" if not settings.is_production else None,
+    # Outside production the schema and docs routes are registered below,
+    # serving a schema built once at startup
+    openapi_url="/openapi.json" if settings.is_production else None,
+    docs_url=None,
+    redoc_url=None,
 )
 
-# CORS - configurable origins from .env
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origin_list,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS - configurable origins from .env. Not installed at all when no origins
+# are configured (same-origin deployments); a "*" entry collapses the list so
+# Starlette takes its allow-all fast path instead of comparing per request.
+cors_origins = settings.cors_origin_list
+if cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"] if "*" in cors_origins else cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Mount static files for UI
 static_path = Path(__file__).parent.parent / "frontend"
 if static_path.exists():
     app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 
-# Routers
-app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
-app.include_router(media.router, prefix="/media", tags=["Media"])
-app.include_router(android.router, prefix="/android", tags=["Android"])
-app.include_router(files.router, prefix="/files", tags=["Files"])
-app.include_router(analysis.router, prefix="/analyze", tags=["Analysis"])
-app.include_router(ai.router, prefix="/ai", tags=["AI"])
+# Resolved once at startup so `/` doesn't stat the filesystem per request
+_index_path = static_path / "index.html"
+_index_path_str = str(_index_path) if _index_path.exists() else None
+_FALLBACK_ROOT_BYTES = orjson.dumps(
+    {"message": "Mobile Media Organizer API is running. Visit /docs for Swagger UI."}
+)
+
+# Routers: (router, prefix, tags) - single source of truth for mounting
+_ROUTERS = (
+    (jobs.router, "/jobs", ("Jobs",)),
+    (media.router, "/media", ("Media",)),
+    (android.router, "/android", ("Android",)),
+    (files.router, "/files", ("Files",)),
+    (analysis.router, "/analyze", ("Analysis",)),
+)
+
+# AI endpoints are unusable without a Gemini key, so don't import or mount them
+if settings.gemini_api_key:
+    from routers import ai
+    _ROUTERS += ((ai.router, "/ai", ("AI",)),)
+else:
+    logging.getLogger("Main").info("GEMINI_API_KEY not set - AI endpoints disabled")
+
+for router, prefix, tags in _ROUTERS:
+    app.include_router(router, prefix=prefix, tags=list(tags))
 
 
-@app.get("/")
+@app.get("/", response_model=None)
 def root():
     """Serve the dashboard UI."""
-    index_path = static_path / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
-    return {"message": "Mobile Media Organizer API is running. Visit /docs for Swagger UI."}
+    if _index_path_str:
+        return FileResponse(_index_path_str)
+    return Response(content=_FALLBACK_ROOT_BYTES, media_type="application/json")
 
 
-@app.get("/health")
+# Settings are fixed for the process lifetime, so the health body is too
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": settings.app_version,
+    "environment": settings.app_env,
+})
+
+
+@app.get("/health", response_class=Response)
 def health_check():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "version": settings.app_version,
-        "environment": settings.app_env,
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+
+# OpenAPI: generated once here, after every route is registered, and served as
+# pre-encoded bytes. FastAPI would otherwise walk all routes/models on the first
+# /openapi.json hit and re-encode the schema on every request.
+if not settings.is_production:
+    _OPENAPI_BYTES = orjson.dumps(app.openapi())
+
+    @app.get("/openapi.json", include_in_schema=False)
+    def openapi_json():
+        return Response(content=_OPENAPI_BYTES, media_type="application/json")
+
+    @app.get("/docs", include_in_schema=False)
+    def swagger_ui():
+        return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{app.title} - Swagger UI")
+
+    @app.get("/redoc", include_in_schema=False)
+    def redoc():
+        return get_redoc_html(openapi_url="/openapi.json", title=f"{app.title} - ReDoc")
@@ -0,0 +1,7 @@
+"""
+API routers. Each module exposes a FastAPI ``router`` mounted by main.py.
+The ``ai`` router is left out of ``__all__``: it pulls in chromadb and the
+Gemini SDK, so main.py imports it explicitly only when GEMINI_API_KEY is set.
+"""
+
+__all__ = ["jobs", "media", "android", "files", "analysis"]
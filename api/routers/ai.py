@@ -1,19 +1,11 @@
 from fastapi import APIRouter, BackgroundTasks
 from services import ai_service
-from services.job_manager import job_manager
+from services.job_manager import job_manager, run_in_job
 from schemas import AIIndexRequest, AISearchRequest, AIAnalyzeRequest
 
 router = APIRouter()
 
 
-def run_ai_index(source_dir: str, job_id: str, force_reindex: bool):
-    """Background task for AI indexing."""
-    try:
-        ai_service.index_media_library(source_dir, job_id, force_reindex)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
 @router.post("/index")
 def index_media(request: AIIndexRequest, background_tasks: BackgroundTasks):
     """
@@ -24,7 +16,9 @@ def index_media(request: AIIndexRequest, background_tasks: BackgroundTasks):
     job_id = job_manager.create_job("ai_index")
 
     background_tasks.add_task(
-        run_ai_index,
+        run_in_job,
+        job_id,
+        ai_service.index_media_library,
         request.source_dir,
         job_id,
         request.force_reindex
@@ -1,19 +1,11 @@
 from fastapi import APIRouter, BackgroundTasks
 from services import file_service
-from services.job_manager import job_manager
+from services.job_manager import job_manager, run_in_job
 from schemas import BaseRequest
 
 router = APIRouter()
 
 
-def run_extensions_report(source_dir: str, job_id: str):
-    """Background task for extension analysis."""
-    try:
-        file_service.analyze_extensions(source_dir, job_id)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
 @router.post("/extensions")
 def extensions_report(request: BaseRequest, background_tasks: BackgroundTasks):
     """
@@ -23,7 +15,9 @@ def extensions_report(request: BaseRequest, background_tasks: BackgroundTasks):
     job_id = job_manager.create_job("extensions_report")
     
     background_tasks.add_task(
-        run_extensions_report,
+        run_in_job,
+        job_id,
+        file_service.analyze_extensions,
         request.source_dir,
         job_id
     )
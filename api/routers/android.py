@@ -1,19 +1,11 @@
 from fastapi import APIRouter, BackgroundTasks
 from services import android_service
-from services.job_manager import job_manager
+from services.job_manager import job_manager, run_in_job
 from schemas import AndroidRequest
 
 router = APIRouter()
 
 
-def run_clean_android(source_dir: str, threshold_mb: int, dry_run: bool, job_id: str, safe_mode: bool):
-    """Background task for Android cleanup."""
-    try:
-        android_service.clean_android_backup(source_dir, threshold_mb, dry_run, job_id, safe_mode)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
 @router.post("/clean")
 def clean_android_backup(request: AndroidRequest, background_tasks: BackgroundTasks):
     """
@@ -23,7 +15,9 @@ def clean_android_backup(request: AndroidRequest, background_tasks: BackgroundTa
     job_id = job_manager.create_job("android_clean")
     
     background_tasks.add_task(
-        run_clean_android,
+        run_in_job,
+        job_id,
+        android_service.clean_android_backup,
         request.source_dir,
         request.threshold_mb,
         request.dry_run,
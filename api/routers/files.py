@@ -1,35 +1,11 @@
 from fastapi import APIRouter, BackgroundTasks
 from services import file_service
-from services.job_manager import job_manager
+from services.job_manager import job_manager, run_in_job
 from schemas import PDFRequest, FileTypeRequest, BaseRequest
 
 router = APIRouter()
 
 
-def run_collect_pdfs(source_dir: str, dest_dir: str, dry_run: bool, job_id: str, safe_mode: bool):
-    """Background task for PDF collection."""
-    try:
-        file_service.collect_pdfs(source_dir, dest_dir, dry_run, job_id, safe_mode)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
-def run_organize_by_type(source_dir: str, dest_dir: str, dry_run: bool, job_id: str, safe_mode: bool):
-    """Background task for file type organization."""
-    try:
-        file_service.organize_files_by_type(source_dir, dest_dir, dry_run, job_id, safe_mode)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
-def run_analyze_extensions(source_dir: str, job_id: str):
-    """Background task for extension analysis."""
-    try:
-        file_service.analyze_extensions(source_dir, job_id)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
 @router.post("/consolidate-pdfs")
 def consolidate_pdfs(request: PDFRequest, background_tasks: BackgroundTasks):
     """
@@ -39,7 +15,9 @@ def consolidate_pdfs(request: PDFRequest, background_tasks: BackgroundTasks):
     job_id = job_manager.create_job("consolidate_pdfs")
     
     background_tasks.add_task(
-        run_collect_pdfs,
+        run_in_job,
+        job_id,
+        file_service.collect_pdfs,
         request.source_dir,
         request.dest_dir,
         request.dry_run,
@@ -63,7 +41,9 @@ def organize_by_type(request: FileTypeRequest, background_tasks: BackgroundTasks
     job_id = job_manager.create_job("organize_types")
     
     background_tasks.add_task(
-        run_organize_by_type,
+        run_in_job,
+        job_id,
+        file_service.organize_files_by_type,
         request.source_dir,
         request.dest_dir,
         request.dry_run,
@@ -87,7 +67,9 @@ def analyze_extensions(request: BaseRequest, background_tasks: BackgroundTasks):
     job_id = job_manager.create_job("analyze_extensions")
     
     background_tasks.add_task(
-        run_analyze_extensions,
+        run_in_job,
+        job_id,
+        file_service.analyze_extensions,
         request.source_dir,
         job_id
     )
@@ -2,18 +2,23 @@
 Jobs Router - Endpoints for job management, status, and SSE streaming.
 """
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from services.job_manager import job_manager
+from fastapi.responses import Response, StreamingResponse
+from services.job_manager import job_manager, TERMINAL_STATES
 import asyncio
-import json
+import orjson
 
 router = APIRouter()
 
+# Idle streams send an SSE comment this often so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
 
-@router.get("")
+
+@router.get("", response_class=Response)
 def list_jobs():
     """List all jobs (active and recent)."""
-    return {"jobs": job_manager.get_all_jobs()}
+    # Encode directly; skips FastAPI's jsonable_encoder pass over every job dict
+    body = b'{"jobs":' + orjson.dumps(job_manager.get_all_jobs()) + b"}"
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{job_id}")
@@ -45,25 +50,29 @@ async def stream_job_progress(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     
     async def event_generator():
-        last_state = None
-        while True:
-            job = job_manager.get_job(job_id)
-            if not job:
-                yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
-                break
-            
-            current_state = job.to_dict()
-            
-            # Only send if state changed
-            if current_state != last_state:
-                yield f"data: {json.dumps(current_state)}\n\n"
-                last_state = current_state.copy()
-            
-            # Stop streaming if job is complete
-            if job.status.value in ["completed", "aborted", "failed"]:
-                break
-            
-            await asyncio.sleep(0.2)  # 200ms polling interval
+        # Jobs are mutated in place, so the object looked up above stays current
+        changed = job_manager.subscribe(job_id)
+        last_version = -1
+        try:
+            while True:
+                # Only send if state changed; the frame is shared by all subscribers
+                version = job.version
+                if version != last_version:
+                    yield job.sse_payload()
+                    last_version = version
+                
+                # Stop streaming if job is complete
+                if job.status in TERMINAL_STATES:
+                    break
+                
+                # Sleep until job_manager signals a change (or send a keepalive)
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                changed.clear()
+        finally:
+            job_manager.unsubscribe(job_id, changed)
     
     return StreamingResponse(
         event_generator(),
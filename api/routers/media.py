@@ -1,27 +1,11 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from services import media_service
-from services.job_manager import job_manager
+from services.job_manager import job_manager, run_in_job
 from schemas import MediaRequest, BaseRequest
 
 router = APIRouter()
 
 
-def run_media_organize(source_dir: str, dest_dir: str, dry_run: bool, job_id: str, safe_mode: bool):
-    """Background task for media organization."""
-    try:
-        media_service.organize_media_by_date(source_dir, dest_dir, dry_run, job_id, safe_mode)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
-def run_expand_dates(source_dir: str, dry_run: bool, job_id: str, safe_mode: bool):
-    """Background task for date expansion."""
-    try:
-        media_service.organize_expanded_dates(source_dir, dry_run, job_id, safe_mode)
-    except Exception as e:
-        job_manager.fail_job(job_id, str(e))
-
-
 @router.post("/organize")
 def organize_media(request: MediaRequest, background_tasks: BackgroundTasks):
     """
@@ -33,7 +17,9 @@ def organize_media(request: MediaRequest, background_tasks: BackgroundTasks):
     
     # Start background task
     background_tasks.add_task(
-        run_media_organize,
+        run_in_job,
+        job_id,
+        media_service.organize_media_by_date,
         request.source_dir,
         request.dest_dir,
         request.dry_run,
@@ -59,7 +45,9 @@ def organize_subfolders(request: BaseRequest, background_tasks: BackgroundTasks)
     
     # Start background task
     background_tasks.add_task(
-        run_expand_dates,
+        run_in_job,
+        job_id,
+        media_service.organize_expanded_dates,
         request.source_dir,
         request.dry_run,
         job_id,
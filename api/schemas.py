@@ -1,11 +1,37 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pathlib import Path
 from typing import Optional
 
+
+def _normalize_path(value: Optional[str]) -> Optional[str]:
+    """Expand ~ and resolve to an absolute path (symlinks resolved), as stored in the index."""
+    if value is None:
+        return None
+    return str(Path(value).expanduser().resolve())
+
+
+def _resolve_source_dir(value: str) -> str:
+    """Normalize to an absolute path once, at the edge, and require a directory."""
+    path = Path(_normalize_path(value))
+    if not path.is_dir():
+        raise ValueError(f"Source directory not found: {value}")
+    return str(path)
+
+
+# Shared by all request bodies: unknown fields are rejected outright, string
+# whitespace is stripped in pydantic-core, and validated requests are immutable.
+_REQUEST_CONFIG = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
+
 class BaseRequest(BaseModel):
+    model_config = _REQUEST_CONFIG
+
     source_dir: str = Field(..., description="Absolute path to the source directory")
     dry_run: bool = Field(True, description="If true, no files will be moved")
     safe_mode: bool = Field(True, description="If true, use copy-verify-delete instead of move")
 
+    _check_source_dir = field_validator("source_dir")(_resolve_source_dir)
+
 class MediaRequest(BaseRequest):
     dest_dir: str = Field(..., description="Destination base directory for media")
 
@@ -22,14 +48,25 @@ class PDFRequest(BaseRequest):
 # --- AI Request Models ---
 
 class AIIndexRequest(BaseModel):
+    model_config = _REQUEST_CONFIG
+
     source_dir: str = Field(..., description="Directory to index with AI analysis")
     force_reindex: bool = Field(False, description="Re-analyze files even if already indexed")
 
+    _check_source_dir = field_validator("source_dir")(_resolve_source_dir)
+
 class AISearchRequest(BaseModel):
+    model_config = _REQUEST_CONFIG
+
     query: str = Field(..., description="Natural language search query")
     top_k: int = Field(10, description="Number of results to return", ge=1, le=100)
     source_dir: Optional[str] = Field(None, description="Optional: limit search to this directory")
 
+    # Normalized like indexed paths so the prefix filter matches; need not exist any more
+    _normalize_source_dir = field_validator("source_dir")(_normalize_path)
+
 class AIAnalyzeRequest(BaseModel):
+    model_config = _REQUEST_CONFIG
+
     file_path: str = Field(..., description="Absolute path to the file or directory to analyze")
 
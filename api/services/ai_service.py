@@ -2,14 +2,27 @@
 AI Service - Gemini-powered media analysis, tagging, and semantic search.
 Uses ChromaDB for local vector storage and Google Gemini for vision + embeddings.
 """
-import json
+import os
+import re
+import asyncio
 import logging
 import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-from config import settings
+import orjson
+
+try:
+    import simplejpeg  # Optional: encodes via libjpeg-turbo with less overhead
+except ImportError:
+    simplejpeg = None
+
+from config import get_settings
+from services.core_logic import iter_files, file_suffix
 from services.job_manager import job_manager
 
 logger = logging.getLogger("AIService")
@@ -19,9 +32,60 @@ _genai = None
 _model = None
 _chroma_client = None
 _collection = None
+_loop = None
+_loop_lock = threading.Lock()
+_thumb_pool = None
+_thumb_pool_lock = threading.Lock()
+_pillow_checked = False
 
 IMAGE_EXTENSIONS = {'.heic', '.jpg', '.jpeg', '.png', '.webp', '.gif', '.dng', '.arw', '.cr2', '.nef'}
 
+# Libraries larger than BATCH_THRESHOLD images are indexed BATCH_SIZE images per
+# Gemini request, paying one network round trip per batch instead of per image
+BATCH_THRESHOLD = 50
+BATCH_SIZE = 8
+
+# Maximum Gemini requests in flight while indexing
+GEMINI_CONCURRENCY = 16
+
+# Rows written to ChromaDB per upsert (one SQLite transaction each)
+UPSERT_BATCH_SIZE = 128
+
+# IDs per existence lookup, keeping each IN-list under SQLite's bound-variable limit
+LOOKUP_CHUNK_SIZE = 5000
+
+# Stored metadata keeps Python's str(bool) casing
+_BOOL_STR = ("False", "True")
+
+_ANALYSIS_FIELDS = """{
+  "description": "one-sentence description of the image",
+  "scene": "indoor/outdoor/closeup/aerial/screenshot/document",
+  "objects": ["list", "of", "main", "objects"],
+  "tags": ["semantic", "tags", "for", "search"],
+  "people_count": 0,
+  "quality_score": 8,
+  "is_screenshot": false,
+  "is_blurry": false,
+  "dominant_colors": ["#hex1", "#hex2"],
+  "suggested_folder": "a suggested folder name like 'Vacation', 'Food', 'Documents'"
+}"""
+
+_ANALYZE_PROMPT = f"""Analyze this image and return a JSON object with these fields:
+{_ANALYSIS_FIELDS}
+Return ONLY the JSON, no markdown fences."""
+
+_ANALYZE_BATCH_PROMPT = """You are given {count} images, each preceded by a label "Image N:" (N = 1 to {count}).
+Analyze each one and return a JSON array of exactly {count} objects, one per image, each with
+an "image_index" field set to that image's N plus these fields:
+{fields}
+Return ONLY the JSON array, no markdown fences."""
+
+
+# Ask for bare JSON output; _strip_fences stays as a fallback for older models
+_JSON_RESPONSE = {"response_mime_type": "application/json"}
+
+_FENCE_RE = re.compile(r'^\s*```(?:json)?|```\s*$', re.I)
+
 
 def _get_genai():
     """Lazy-initialize the Gemini SDK."""
@@ -29,6 +93,7 @@ def _get_genai():
     if _genai is None:
         import google.generativeai as genai
 
+        settings = get_settings()
         if not settings.gemini_api_key:
             raise ValueError(
                 "GEMINI_API_KEY is not set in .env file. "
@@ -46,7 +111,7 @@ def _get_collection():
     if _collection is None:
         import chromadb
 
-        _chroma_client = chromadb.PersistentClient(path=settings.resolved_chroma_path)
+        _chroma_client = chromadb.PersistentClient(path=get_settings().resolved_chroma_path)
         _collection = _chroma_client.get_or_create_collection(
             name="media_index",
             metadata={"hnsw:space": "cosine"}
@@ -54,33 +119,196 @@ def _get_collection():
     return _collection
 
 
-def _generate_thumbnail(file_path: Path) -> Optional[bytes]:
-    """Generate an in-memory JPEG thumbnail for API upload."""
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Start (once) the background event loop that runs async Gemini calls.
+    The SDK's async client binds to the loop it first runs on, so every
+    call goes through this one long-lived loop.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="gemini-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _check_pillow_simd():
+    """Log (once) a hint when stock Pillow runs on a CPU Pillow-SIMD could accelerate."""
+    global _pillow_checked
+    if _pillow_checked:
+        return
+    _pillow_checked = True
+
+    import PIL
+
+    # Pillow-SIMD releases carry a ".postN" version suffix
+    if "post" in PIL.__version__:
+        logger.info(f"Using Pillow-SIMD {PIL.__version__} for thumbnails")
+        return
+    try:
+        with open("/proc/cpuinfo") as f:
+            has_avx2 = any(line.startswith("flags") and " avx2" in line for line in f)
+    except OSError:
+        return  # Not Linux; nothing to probe
+    if has_avx2:
+        logger.info(
+            "CPU supports AVX2: `pip uninstall pillow && pip install pillow-simd` "
+            "can speed up thumbnail generation several times"
+        )
+
+
+def _get_thumb_pool() -> ProcessPoolExecutor:
+    """
+    Start (once) the worker processes that render thumbnails.
+    Uses spawn so workers never inherit the server's threads mid-fork.
+    """
+    global _thumb_pool
+    with _thumb_pool_lock:
+        if _thumb_pool is None:
+            _thumb_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _thumb_pool
+
+
+def _thumb_cache_dir() -> Optional[str]:
+    """Directory for cached thumbnails (created on demand), or None if disabled."""
+    settings = get_settings()
+    if settings.thumbnail_cache_mb <= 0:
+        return None
+    cache_dir = Path(settings.resolved_chroma_path) / "thumbs"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return str(cache_dir)
+
+
+def _thumb_cache_path(cache_dir: str, cache_id: str, max_dim: int) -> Path:
+    """Cached thumbnail location; the size is part of the key so setting changes miss."""
+    return Path(cache_dir) / f"{cache_id}_{max_dim}.jpg"
+
+
+def _prune_thumb_cache(cache_dir: str, budget_bytes: int):
+    """Delete least recently used thumbnails until the cache fits its budget."""
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+    if total <= budget_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= budget_bytes:
+            break
+
+
+async def _render_thumbnails(paths: List[Path]) -> List[Optional[bytes]]:
+    """Render thumbnails for paths in one worker-process task."""
+    max_dim = get_settings().thumbnail_max_size
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_thumb_pool(), _generate_thumbnails, paths, max_dim, _thumb_cache_dir()
+    )
+
+
+def _generate_thumbnails(paths: List[Path], max_dim: int, cache_dir: Optional[str] = None) -> List[Optional[bytes]]:
+    """Generate thumbnails for several files (one IPC round trip per batch)."""
+    return [_generate_thumbnail(path, max_dim, cache_dir) for path in paths]
+
+
+def _generate_thumbnail(file_path: Path, max_dim: int, cache_dir: Optional[str] = None) -> Optional[bytes]:
+    """
+    Generate an in-memory JPEG thumbnail for API upload.
+    With a cache_dir, thumbnails are reused across runs keyed by _file_cache_id.
+    """
     from PIL import Image
     import io
 
-    max_dim = settings.thumbnail_max_size
+    cache_path = None
+    if cache_dir:
+        try:
+            cache_path = _thumb_cache_path(cache_dir, _file_cache_id(file_path), max_dim)
+            data = cache_path.read_bytes()
+            os.utime(cache_path)  # Mark as recently used for pruning
+            return data
+        except OSError:
+            pass
+
     try:
         img = Image.open(file_path)
-        img.thumbnail((max_dim, max_dim))
+        # Let libjpeg decode at a reduced scale (no-op for other formats)
+        img.draft("RGB", (max_dim, max_dim))
+        img.thumbnail((max_dim, max_dim), Image.BICUBIC)
         if img.mode in ("RGBA", "P"):
             img = img.convert("RGB")
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=80)
-        return buffer.getvalue()
+        if simplejpeg is not None and img.mode == "RGB":
+            import numpy as np
+            data = simplejpeg.encode_jpeg(np.asarray(img), quality=80, colorspace="RGB")
+        else:
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=80)
+            data = buffer.getvalue()
     except Exception as e:
         logger.warning(f"Could not generate thumbnail for {file_path.name}: {e}")
         return None
 
+    if cache_path is not None:
+        # Write to a temp file and rename so readers never see a partial thumbnail
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache thumbnail for {file_path.name}: {e}")
+    return data
 
-def _file_cache_id(file_path: Path) -> str:
-    """Generate a stable cache ID from path + modification time."""
-    mtime = file_path.stat().st_mtime
-    raw = f"{str(file_path)}:{mtime}"
-    return hashlib.md5(raw.encode()).hexdigest()
 
+def _file_cache_id(file_path: Path, mtime: Optional[float] = None) -> str:
+    """
+    Generate a stable cache ID from path + modification time.
+    Pass mtime when it is already known (e.g. from a DirEntry) to skip the stat.
+    The digest equals md5(f"{path}:{mtime}"), so existing IDs stay valid.
+    """
+    if mtime is None:
+        mtime = file_path.stat().st_mtime
+    hasher = hashlib.md5(str(file_path).encode(), usedforsecurity=False)
+    hasher.update(b":")
+    hasher.update(str(mtime).encode())
+    return hasher.hexdigest()
 
-def analyze_image(file_path: str) -> Dict[str, Any]:
+
+def _strip_fences(text: str) -> str:
+    """Remove markdown code fences Gemini sometimes wraps around JSON."""
+    return _FENCE_RE.sub("", text).strip()
+
+
+def _parse_analysis(path: Path, text: str) -> Dict[str, Any]:
+    """Parse a single-image Gemini response into an analysis dict."""
+    try:
+        result = orjson.loads(_strip_fences(text))
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Failed to parse Gemini response for {path.name}: {e}")
+        return {"error": "Invalid AI response", "file": path.name, "raw": text[:200]}
+    result["file"] = path.name
+    result["path"] = str(path)
+    result["analyzed_at"] = datetime.now().isoformat()
+    return result
+
+
+async def analyze_image_async(file_path: str) -> Dict[str, Any]:
     """
     Analyze a single image using Gemini Vision.
     Returns structured tags: scene, objects, quality, etc.
@@ -92,55 +320,171 @@ def analyze_image(file_path: str) -> Dict[str, Any]:
     if path.suffix.lower() not in IMAGE_EXTENSIONS:
         return {"error": f"Unsupported file type: {path.suffix}"}
 
-    thumb_bytes = _generate_thumbnail(path)
+    # PIL work runs in a worker process so it doesn't block the event loop
+    thumb_bytes, = await _render_thumbnails([path])
     if thumb_bytes is None:
         return {"error": "Could not read image"}
 
     genai, model = _get_genai()
 
-    prompt = """Analyze this image and return a JSON object with these fields:
-{
-  "description": "one-sentence description of the image",
-  "scene": "indoor/outdoor/closeup/aerial/screenshot/document",
-  "objects": ["list", "of", "main", "objects"],
-  "tags": ["semantic", "tags", "for", "search"],
-  "people_count": 0,
-  "quality_score": 8,
-  "is_screenshot": false,
-  "is_blurry": false,
-  "dominant_colors": ["#hex1", "#hex2"],
-  "suggested_folder": "a suggested folder name like 'Vacation', 'Food', 'Documents'"
-}
-Return ONLY the JSON, no markdown fences."""
-
     try:
-        response = model.generate_content([
-            prompt,
+        response = await model.generate_content_async([
+            _ANALYZE_PROMPT,
             {"mime_type": "image/jpeg", "data": thumb_bytes}
-        ])
-
-        text = response.text.strip()
-        # Strip markdown fences if present
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-        if text.endswith("```"):
-            text = text.rsplit("```", 1)[0]
-        text = text.strip()
-
-        result = json.loads(text)
-        result["file"] = path.name
-        result["path"] = str(path)
-        result["analyzed_at"] = datetime.now().isoformat()
-        return result
-
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse Gemini response for {path.name}: {e}")
-        return {"error": "Invalid AI response", "file": path.name, "raw": text[:200]}
+        ], generation_config=_JSON_RESPONSE)
+        return _parse_analysis(path, response.text)
     except Exception as e:
         logger.error(f"Gemini API error for {path.name}: {e}")
         return {"error": str(e), "file": path.name}
 
 
+def analyze_image(file_path: str) -> Dict[str, Any]:
+    """Blocking wrapper around analyze_image_async() for sync callers."""
+    return asyncio.run_coroutine_threadsafe(analyze_image_async(file_path), _get_loop()).result()
+
+
+async def analyze_images_batch_async(paths: List[Path]) -> List[Dict[str, Any]]:
+    """
+    Analyze several images with a single Gemini Vision request.
+    Each image is labelled with an index that the model echoes back, and
+    analyses are matched to files by that index, never by list position.
+    Returns one result per path, in order. If the response can't be parsed or
+    its indices don't map one-to-one onto the images sent, every image falls
+    back to its own analyze_image_async() call.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+    parts = []
+    sent = []  # Indices of the images included in the request
+
+    thumbs = await _render_thumbnails(paths)
+    for idx, (path, thumb_bytes) in enumerate(zip(paths, thumbs)):
+        if thumb_bytes is None:
+            results[idx] = {"error": "Could not read image", "file": path.name}
+            continue
+        sent.append(idx)
+        parts.append(f"Image {len(sent)}:")
+        parts.append({"mime_type": "image/jpeg", "data": thumb_bytes})
+
+    if not sent:
+        return results
+
+    _, model = _get_genai()
+    prompt = _ANALYZE_BATCH_PROMPT.format(count=len(sent), fields=_ANALYSIS_FIELDS)
+
+    try:
+        response = await model.generate_content_async([prompt, *parts], generation_config=_JSON_RESPONSE)
+        analyses = orjson.loads(_strip_fences(response.text))
+        if not isinstance(analyses, list) or len(analyses) != len(sent):
+            raise ValueError(f"Expected a list of {len(sent)} analyses")
+        # image_index (1-based) -> analysis; any missing, duplicate or unknown index rejects the batch
+        by_index = {}
+        for analysis in analyses:
+            image_index = analysis.pop("image_index", None) if isinstance(analysis, dict) else None
+            if type(image_index) is not int or not 1 <= image_index <= len(sent) or image_index in by_index:
+                raise ValueError(f"Analyses don't map one-to-one onto the {len(sent)} images sent")
+            by_index[image_index] = analysis
+    except Exception as e:
+        logger.warning(f"Batch analysis of {len(sent)} images failed, retrying individually: {e}")
+        retried = await asyncio.gather(*(analyze_image_async(str(paths[idx])) for idx in sent))
+        for idx, analysis in zip(sent, retried):
+            results[idx] = analysis
+        return results
+
+    analyzed_at = datetime.now().isoformat()
+    for image_index, idx in enumerate(sent, 1):
+        path = paths[idx]
+        analysis = by_index[image_index]
+        analysis["file"] = path.name
+        analysis["path"] = str(path)
+        analysis["analyzed_at"] = analyzed_at
+        results[idx] = analysis
+
+    return results
+
+
+async def _analyze_unit(semaphore: asyncio.Semaphore, unit: List[tuple]) -> List[Dict[str, Any]]:
+    """Analyze one unit of (file_path, cache_id) pairs, holding a concurrency slot."""
+    async with semaphore:
+        if len(unit) > 1:
+            return await analyze_images_batch_async([file_path for file_path, _ in unit])
+        return [await analyze_image_async(str(unit[0][0]))]
+
+
+def _existing_ids(collection, ids: List[str]) -> set:
+    """Return the subset of ids already in the collection, fetching IDs only."""
+    found = set()
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        chunk = ids[start:start + LOOKUP_CHUNK_SIZE]
+        found.update(collection.get(ids=chunk, include=[])["ids"])
+    return found
+
+
+def _flush_upserts(collection, pending: List[tuple], results: Dict[str, Any]):
+    """
+    Write buffered (file_path, cache_id, analysis) rows to ChromaDB in a
+    single upsert and clear the buffer. Documents and metadata for the whole
+    batch are built here in one pass.
+    """
+    count = len(pending)
+    if not count:
+        return
+    try:
+        collection.upsert(
+            ids=[cache_id for _, cache_id, _ in pending],
+            # Searchable text
+            documents=[
+                " ".join((
+                    a.get("description", ""),
+                    a.get("scene", ""),
+                    " ".join(a.get("objects", [])),
+                    " ".join(a.get("tags", [])),
+                    a.get("suggested_folder", "")
+                ))
+                for _, _, a in pending
+            ],
+            metadatas=[
+                {
+                    "path": str(file_path),
+                    "name": file_path.name,
+                    "description": a.get("description", ""),
+                    "scene": a.get("scene", ""),
+                    "tags": orjson.dumps(a.get("tags", [])).decode(),
+                    "quality_score": a.get("quality_score", 0),
+                    "is_screenshot": _BOOL_STR[bool(a.get("is_screenshot", False))],
+                    "is_blurry": _BOOL_STR[bool(a.get("is_blurry", False))],
+                    "suggested_folder": a.get("suggested_folder", ""),
+                    "analyzed_at": a.get("analyzed_at", "")
+                }
+                for file_path, _, a in pending
+            ]
+        )
+        results["indexed"] += count
+        results["details"].extend({"file": file_path.name, "status": "indexed"} for file_path, _, _ in pending)
+    except Exception as e:
+        logger.error(f"ChromaDB error upserting {count} items: {e}")
+        results["errors"] += count
+    pending.clear()
+
+
+def _store_analyses(
+    collection,
+    unit: List[tuple],
+    analyses: List[Dict[str, Any]],
+    pending: List[tuple],
+    results: Dict[str, Any]
+):
+    """Buffer the analyses of (file_path, cache_id) pairs, flushing full batches to ChromaDB."""
+    for (file_path, cache_id), analysis in zip(unit, analyses):
+        if "error" in analysis:
+            results["errors"] += 1
+            results["details"].append({"file": file_path.name, "error": analysis["error"]})
+            continue
+        pending.append((file_path, cache_id, analysis))
+
+    if len(pending) >= UPSERT_BATCH_SIZE:
+        _flush_upserts(collection, pending, results)
+
+
 def index_media_library(
     source_dir: str,
     job_id: Optional[str] = None,
@@ -159,18 +503,30 @@ def index_media_library(
     collection = _get_collection()
 
     # Collect image files
-    all_files = [
-        p for p in source.rglob("*")
-        if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+    entries = [
+        entry for entry in iter_files(source)
+        if file_suffix(entry.name).lower() in IMAGE_EXTENSIONS
     ]
+    all_files = [Path(entry.path) for entry in entries]
     total = len(all_files)
 
     if job_id:
         job_manager.start_job(job_id, total)
 
+    _check_pillow_simd()
+
     results = {"indexed": 0, "skipped": 0, "errors": 0, "total": total, "details": []}
 
-    for i, file_path in enumerate(all_files):
+    # Large libraries are analyzed several images per request
+    batch_size = BATCH_SIZE if total > BATCH_THRESHOLD else 1
+    units = []  # Lists of (file_path, cache_id) awaiting analysis
+    pending = []
+
+    # One bulk lookup of already-indexed files instead of a get() per file
+    cache_ids = [_file_cache_id(p, entry.stat().st_mtime) for p, entry in zip(all_files, entries)]
+    existing = set() if force_reindex else _existing_ids(collection, cache_ids)
+
+    for i, (file_path, cache_id) in enumerate(zip(all_files, cache_ids)):
         # Check for abort
         if job_id and job_manager.is_aborted(job_id):
             results["aborted"] = True
@@ -178,68 +534,67 @@ def index_media_library(
             job_manager.mark_aborted(job_id, results)
             return results
 
-        cache_id = _file_cache_id(file_path)
-
         # Skip if already indexed (unless force)
-        if not force_reindex:
-            existing = collection.get(ids=[cache_id])
-            if existing and existing["ids"]:
-                results["skipped"] += 1
-                if job_id:
-                    job_manager.update_progress(
-                        job_id, i + 1, total,
-                        message=f"Skipped (cached): {file_path.name}",
-                        current_file=file_path.name
-                    )
-                continue
+        if cache_id in existing:
+            results["skipped"] += 1
+            if job_id:
+                job_manager.update_progress(
+                    job_id, results["skipped"], total,
+                    message=f"Skipped (cached): {file_path.name}",
+                    current_file=file_path.name
+                )
+            continue
 
-        # Analyze
+        pending.append((file_path, cache_id))
+        if len(pending) == batch_size:
+            units.append(pending)
+            pending = []
+
+    if pending:
+        units.append(pending)
+
+    # Analyze concurrently on the Gemini loop; upserts stay on this thread
+    # since ChromaDB's SQLite store has a single writer
+    loop = _get_loop()
+    semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+    futures = {
+        asyncio.run_coroutine_threadsafe(_analyze_unit(semaphore, unit), loop): unit
+        for unit in units
+    }
+    processed = results["skipped"]
+    rows = []  # (file_path, cache_id, analysis) awaiting upsert
+
+    for future in as_completed(futures):
+        if job_id and job_manager.is_aborted(job_id):
+            for f in futures:
+                f.cancel()
+            _flush_upserts(collection, rows, results)
+            results["aborted"] = True
+            results["message"] = f"Aborted after processing {processed} of {total} files"
+            job_manager.mark_aborted(job_id, results)
+            return results
+
+        unit = futures[future]
+        try:
+            analyses = future.result()
+        except Exception as e:
+            analyses = [{"error": str(e)}] * len(unit)
+        _store_analyses(collection, unit, analyses, rows, results)
+
+        processed += len(unit)
         if job_id:
+            last_name = unit[-1][0].name
             job_manager.update_progress(
-                job_id, i + 1, total,
-                message=f"Analyzing: {file_path.name}",
-                current_file=file_path.name
+                job_id, processed, total,
+                message=f"Analyzed: {last_name}",
+                current_file=last_name
             )
 
-        analysis = analyze_image(str(file_path))
+    _flush_upserts(collection, rows, results)
 
-        if "error" in analysis:
-            results["errors"] += 1
-            results["details"].append({"file": file_path.name, "error": analysis["error"]})
-            continue
-
-        # Build searchable text
-        search_text = " ".join([
-            analysis.get("description", ""),
-            analysis.get("scene", ""),
-            " ".join(analysis.get("objects", [])),
-            " ".join(analysis.get("tags", [])),
-            analysis.get("suggested_folder", "")
-        ])
-
-        # Store in ChromaDB
-        try:
-            collection.upsert(
-                ids=[cache_id],
-                documents=[search_text],
-                metadatas=[{
-                    "path": str(file_path),
-                    "name": file_path.name,
-                    "description": analysis.get("description", ""),
-                    "scene": analysis.get("scene", ""),
-                    "tags": json.dumps(analysis.get("tags", [])),
-                    "quality_score": analysis.get("quality_score", 0),
-                    "is_screenshot": str(analysis.get("is_screenshot", False)),
-                    "is_blurry": str(analysis.get("is_blurry", False)),
-                    "suggested_folder": analysis.get("suggested_folder", ""),
-                    "analyzed_at": analysis.get("analyzed_at", "")
-                }]
-            )
-            results["indexed"] += 1
-            results["details"].append({"file": file_path.name, "status": "indexed"})
-        except Exception as e:
-            logger.error(f"ChromaDB error for {file_path.name}: {e}")
-            results["errors"] += 1
+    cache_dir = _thumb_cache_dir()
+    if cache_dir:
+        _prune_thumb_cache(cache_dir, get_settings().thumbnail_cache_mb * 1024 * 1024)
 
     if job_id:
         job_manager.complete_job(job_id, results)
@@ -253,23 +608,27 @@ def search_media(query: str, top_k: int = 10, source_dir: Optional[str] = None)
     """
     collection = _get_collection()
 
-    if collection.count() == 0:
+    # One count() per query (other workers/processes may write the index)
+    total = collection.count()
+    if total == 0:
         return {"results": [], "message": "No indexed media. Run /ai/index first."}
 
     try:
         search_results = collection.query(
             query_texts=[query],
-            n_results=min(top_k, collection.count())
+            n_results=min(top_k, total)
         )
 
         results = []
+        # Trailing separator, so /photos doesn't also match /photos2
+        source_prefix = os.path.join(source_dir, '') if source_dir else None
         if search_results and search_results["ids"]:
             for idx, doc_id in enumerate(search_results["ids"][0]):
                 meta = search_results["metadatas"][0][idx] if search_results["metadatas"] else {}
                 distance = search_results["distances"][0][idx] if search_results["distances"] else 0
 
                 # Filter by source_dir if specified
-                if source_dir and not meta.get("path", "").startswith(source_dir):
+                if source_prefix and not meta.get("path", "").startswith(source_prefix):
                     continue
 
                 results.append({
@@ -277,7 +636,7 @@ def search_media(query: str, top_k: int = 10, source_dir: Optional[str] = None)
                     "path": meta.get("path", ""),
                     "description": meta.get("description", ""),
                     "scene": meta.get("scene", ""),
-                    "tags": json.loads(meta.get("tags", "[]")),
+                    "tags": orjson.loads(meta.get("tags", "[]")),
                     "quality_score": meta.get("quality_score", 0),
                     "suggested_folder": meta.get("suggested_folder", ""),
                     "relevance_score": round(1 - distance, 3) if distance else 0
@@ -299,8 +658,8 @@ def get_smart_suggestions(source_dir: str) -> Dict[str, Any]:
         return {"error": "Source directory not found"}
 
     all_images = [
-        p for p in source.rglob("*")
-        if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+        Path(entry.path) for entry in iter_files(source)
+        if file_suffix(entry.name).lower() in IMAGE_EXTENSIONS
     ]
 
     # Sample up to 20 images for suggestions
@@ -322,7 +681,7 @@ def get_smart_suggestions(source_dir: str) -> Dict[str, Any]:
     # Ask Gemini for organization suggestions
     _, model = _get_genai()
 
-    summary = json.dumps([
+    summary = orjson.dumps([
         {
             "file": a["file"],
             "description": a.get("description", ""),
@@ -331,7 +690,7 @@ def get_smart_suggestions(source_dir: str) -> Dict[str, Any]:
             "suggested_folder": a.get("suggested_folder", "")
         }
         for a in analyses
-    ], indent=2)
+    ]).decode()
 
     prompt = f"""Based on these analyzed images from a user's media library, suggest an optimal folder structure.
 
@@ -349,13 +708,8 @@ Return a JSON object with:
 Return ONLY the JSON, no markdown fences."""
 
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-        if text.endswith("```"):
-            text = text.rsplit("```", 1)[0]
-        return json.loads(text.strip())
+        response = model.generate_content(prompt, generation_config=_JSON_RESPONSE)
+        return orjson.loads(_strip_fences(response.text))
     except Exception as e:
         logger.error(f"Suggestions error: {e}")
         return {"error": str(e)}
@@ -1,8 +1,18 @@
 from pathlib import Path
 import re
-from services.core_logic import safe_move_file, logger
+from services.core_logic import run_moves_parallel, new_details, iter_files, file_suffix, logger
 from services.job_manager import job_manager
 
+# Alternatives are unioned so each name needs a single match() call
+RE_WHATSAPP = re.compile(r'(?:.*\.crypt\d+|msgstore.*\.db.*)$', re.I)
+RE_JUNK_NAME = re.compile(r'\.|(?:\d+|[a-fA-F0-9]+)$')
+
+JUNK_EXTS = frozenset({'.tmp', '.log', '.chck', '.pcm', '.clean', '.exo', '.bkup', '.swatch'})
+PROTECTED_EXTS = frozenset({'.doc', '.docx', '.pdf', '.jpg', '.png', '.mp4', '.apk', '.xlsx', '.pptx'})
+
+# Extension -> "protected" / "junk", so each file needs one dict lookup
+EXT_KIND = {ext: 'junk' for ext in JUNK_EXTS} | {ext: 'protected' for ext in PROTECTED_EXTS}
+
 
 def clean_android_backup(source_dir: str, threshold_mb: int = 50, dry_run: bool = True, job_id: str = None, safe_mode: bool = True):
     """
@@ -19,90 +29,69 @@ def clean_android_backup(source_dir: str, threshold_mb: int = 50, dry_run: bool
     DIR_LARGE_CACHE = source / "_suspected_cache"
     DIR_JUNK_CACHE = source / "_junk_cache"
     
-    RE_WHATSAPP = [re.compile(r'.*\.crypt\d+$', re.I), re.compile(r'^msgstore.*\.db.*$', re.I)]
-    RE_JUNK_NAME = [re.compile(r'^\d+$'), re.compile(r'^[a-fA-F0-9]+$'), re.compile(r'^\.+')]
-    JUNK_EXTS = {'.tmp', '.log', '.chck', '.pcm', '.clean', '.exo', '.bkup', '.swatch'}
-    PROTECTED_EXTS = {'.doc', '.docx', '.pdf', '.jpg', '.png', '.mp4', '.apk', '.xlsx', '.pptx'}
-    
     threshold_bytes = threshold_mb * 1024 * 1024
-    results = {"moved": 0, "errors": 0, "details": []}
+    results = {"moved": 0, "errors": 0, "details": new_details()}
     
     # First pass: collect files to process
     all_files = []
-    for path in source.rglob('*'):
-        if not path.is_file():
-            continue
-        # Avoid self-processing
-        if any(p.name in ["_whatsapp_backup", "_suspected_cache", "_junk_cache"] for p in path.parents):
+    # Output folders are pruned from the walk to avoid self-processing
+    for entry in iter_files(source, skip_dirs=(DIR_WHATSAPP.name, DIR_LARGE_CACHE.name, DIR_JUNK_CACHE.name)):
+        name = entry.name
+        ext = file_suffix(name).lower()
+        kind = EXT_KIND.get(ext)
+        if kind == 'protected':
             continue
         
-        ext = path.suffix.lower()
-        if ext in PROTECTED_EXTS:
-            continue
-            
-        name = path.name
-        size = path.stat().st_size
-        
         target_dir = None
         reason = None
         
-        if any(p.match(name) for p in RE_WHATSAPP):
+        if RE_WHATSAPP.match(name):
             target_dir = DIR_WHATSAPP
             reason = "WhatsApp Backup"
-        elif ext in JUNK_EXTS:
+        elif kind == 'junk':
             target_dir = DIR_JUNK_CACHE
             reason = f"Junk Extension {ext}"
         elif not ext:
-            if size >= threshold_bytes:
+            if entry.stat().st_size >= threshold_bytes:
                 target_dir = DIR_LARGE_CACHE
                 reason = f"Large No-Ext File (> {threshold_mb}MB)"
-            elif any(p.match(name) for p in RE_JUNK_NAME) or 'thumbdata' in name.lower():
+            elif RE_JUNK_NAME.match(name) or 'thumbdata' in name.lower():
                 target_dir = DIR_JUNK_CACHE
                 reason = "Junk Name Pattern"
         
         if target_dir:
-            all_files.append((path, target_dir, reason))
+            all_files.append((Path(entry.path), target_dir, reason))
     
     total = len(all_files)
     
     if job_id:
         job_manager.start_job(job_id, total)
     
-    # Helper
-    def progress_callback(msg: str):
-        if job_id:
-            job_manager.update_progress(
-                job_id, 
-                current=i+1, 
-                total=total, 
-                message=msg, 
-                current_file=path.name
-            )
-
-    for i, (path, target_dir, reason) in enumerate(all_files):
-        # Check for abort
-        if job_id and job_manager.is_aborted(job_id):
-            results["aborted"] = True
-            results["message"] = f"Aborted after processing {i} of {total} files"
-            job_manager.mark_aborted(job_id, results)
-            return results
-        
-        res = safe_move_file(path, target_dir, dry_run, reason, safe_mode, progress_callback)
-        results["details"].append(res)
-        
-        if res.get("status") in ["moved", "dry_run"]:
-            results["moved"] += 1
-        
-        # Update progress
+    moves = all_files  # (src, target_dir, reason)
+    
+    # Moves run on a thread pool; progress advances as each one completes
+    def on_done(completed: int, index: int, res: dict):
         if job_id:
+            name = moves[index][0].name
             job_manager.update_progress(
                 job_id,
-                current=i + 1,
+                current=completed,
                 total=total,
-                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {path.name}",
-                current_file=path.name
+                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {name}",
+                current_file=name
             )
     
+    should_abort = (lambda: job_manager.is_aborted(job_id)) if job_id else None
+    details, aborted = run_moves_parallel(moves, dry_run, safe_mode, on_done, should_abort)
+    results["details"] = details
+    results["moved"] = sum(1 for status in details["status"] if status in ("moved", "dry_run"))
+    
+    if aborted:
+        results["aborted"] = True
+        results["message"] = f"Aborted after processing {len(details['status'])} of {total} files"
+        job_manager.mark_aborted(job_id, results)
+        return results
+    
     if job_id:
         job_manager.complete_job(job_id, results)
                 
@@ -1,19 +1,168 @@
 import os
+import mmap
 import shutil
 import logging
 import hashlib
+import threading
 from pathlib import Path
-from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Callable, Iterator, Iterable, List, Tuple
+
+try:
+    import blake3  # Optional: SIMD/multi-threaded hashing, much faster than SHA-256
+except ImportError:
+    blake3 = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("DiskOrganizer")
 
-def get_unique_path(target_dir: Path, filename: str) -> Path:
+DEFAULT_CHECKSUM_ALGORITHM = 'blake3' if blake3 is not None else 'sha256'
+
+# Files above this size are hashed by BLAKE3 via mmap across multiple threads
+BLAKE3_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Concurrent safe_move_file calls in run_moves_parallel (I/O-bound, so threads scale)
+MOVE_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Concurrent subtree walks in map_subtrees (readdir/stat release the GIL)
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Columns of a move-details table; one list per field, one row per safe_move_file result
+DETAIL_FIELDS = ("status", "src", "dest", "reason", "mode", "file", "error")
+
+def new_details() -> dict:
+    """Returns an empty column-oriented details table (see DETAIL_FIELDS)."""
+    return {field: [] for field in DETAIL_FIELDS}
+
+def append_detail(details: dict, res: dict) -> None:
+    """Appends one safe_move_file result to a details table; absent fields are None."""
+    for field in DETAIL_FIELDS:
+        details[field].append(res.get(field))
+
+def file_suffix(name: str) -> str:
+    """
+    Returns the extension of a file name, following the same rules as
+    Path.suffix (no suffix for dotfiles or names ending in a dot).
+    """
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
+
+def iter_files(root, skip_dirs: Iterable[str] = ()) -> Iterator[os.DirEntry]:
+    """
+    Yields an os.DirEntry for every file below root using os.scandir, so
+    is_file()/stat() come from the directory listing where the OS provides it.
+    Directories whose name is in skip_dirs are pruned rather than filtered per
+    file; symlinked directories are not followed and unreadable ones are
+    skipped, as with Path.rglob.
+    """
+    skip_dirs = frozenset(skip_dirs)
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+
+def map_subtrees(root, fn: Callable[[Iterator[os.DirEntry]], object], skip_dirs: Iterable[str] = (), max_workers: int = SCAN_WORKERS) -> list:
+    """
+    Walks root on a thread pool, one task per top-level directory plus one for
+    the files directly in root. fn is called with an iterator of file DirEntry
+    objects (as from iter_files) for its part of the tree; the return values
+    are returned in listing order for the caller to merge.
+    """
+    skip_dirs = frozenset(skip_dirs)
+    top_files = []
+    top_dirs = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            top_dirs.append(entry.path)
+                    elif entry.is_file():
+                        top_files.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fn, iter(top_files))]
+        futures += [executor.submit(fn, iter_files(path, skip_dirs)) for path in top_dirs]
+        return [future.result() for future in futures]
+
+class NameReservations:
+    """
+    Destination names handed out during one batch of moves.
+    Tracks paths claimed by in-flight moves, so concurrent workers never pick
+    the same name before either file exists. Once a directory has a name
+    collision, its listing is read once and further collisions there are
+    resolved in memory instead of probing the filesystem per candidate.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths = set()
+        self.dir_names = {}
+
+    def _names_in(self, target_dir: Path) -> set:
+        names = self.dir_names.get(target_dir)
+        if names is None:
+            try:
+                names = set(os.listdir(target_dir))
+            except OSError:
+                names = set()
+            names.update(p.name for p in self.paths if p.parent == target_dir)
+            self.dir_names[target_dir] = names
+        return names
+
+    def claim(self, target_dir: Path, filename: str) -> Path:
+        """Returns a free path for filename in target_dir and reserves it."""
+        with self.lock:
+            target_path = target_dir / filename
+            if target_dir not in self.dir_names and target_path not in self.paths and not target_path.exists():
+                self.paths.add(target_path)
+                return target_path
+            
+            names = self._names_in(target_dir)
+            stem = target_path.stem
+            suffix = target_path.suffix
+            candidate = filename
+            counter = 0
+            while True:
+                if candidate not in names:
+                    new_path = target_dir / candidate
+                    # One stat confirms the snapshot (case-insensitive filesystems, other writers)
+                    if not new_path.exists():
+                        break
+                    names.add(candidate)
+                counter += 1
+                candidate = f"{stem}_{counter}{suffix}"
+            names.add(candidate)
+            self.paths.add(new_path)
+            return new_path
+
+def get_unique_path(target_dir: Path, filename: str, reserved: Optional[NameReservations] = None) -> Path:
     """
     Generates a unique filename if the file already exists in the destination.
     Appends _1, _2, etc. to the filename.
+    With reserved, the name is resolved and claimed through the batch's
+    NameReservations instead.
     """
+    if reserved is not None:
+        return reserved.claim(target_dir, filename)
+    
     target_path = target_dir / filename
     if not target_path.exists():
         return target_path
@@ -28,12 +177,50 @@ def get_unique_path(target_dir: Path, filename: str) -> Path:
             return new_path
         counter += 1
 
-def calculate_checksum(file_path: Path, algorithm: str = 'sha256', chunk_size: int = 8192) -> str:
-    """Calculates the checksum of a file."""
-    hasher = hashlib.new(algorithm)
+def _new_hasher(algorithm: str):
+    """Returns a hasher for algorithm; 'blake3' or any hashlib algorithm name."""
+    if algorithm == 'blake3':
+        if blake3 is None:
+            raise ValueError("blake3 checksums require the 'blake3' package")
+        return blake3.blake3()
+    return hashlib.new(algorithm)
+
+def calculate_checksum(file_path: Path, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM, chunk_size: int = 1 << 20) -> str:
+    """
+    Calculates the checksum of a file.
+    Files larger than one chunk are memory-mapped and hashed in a single
+    update() call, so the hash runs over one contiguous buffer.
+    """
+    size = os.path.getsize(file_path)
+    if algorithm == 'blake3' and blake3 is not None and size > BLAKE3_MMAP_THRESHOLD:
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        hasher.update_mmap(file_path)
+        return hasher.hexdigest()
+
+    hasher = _new_hasher(algorithm)
     with open(file_path, 'rb') as f:
-        while chunk := f.read(chunk_size):
+        if size > chunk_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        else:
+            while chunk := f.read(chunk_size):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _copy_and_hash(src: Path, dest: Path, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM, chunk_size: int = 1 << 20) -> str:
+    """
+    Copies src to dest (data + metadata, like shutil.copy2), hashing the
+    bytes as they stream through so the source is only read once.
+    Returns the source checksum. dest is fsynced before returning.
+    """
+    hasher = _new_hasher(algorithm)
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+        while chunk := fsrc.read(chunk_size):
             hasher.update(chunk)
+            fdest.write(chunk)
+        fdest.flush()
+        os.fsync(fdest.fileno())
+    shutil.copystat(src, dest)
     return hasher.hexdigest()
 
 def check_disk_space(dest_dir: Path, required_bytes: int) -> bool:
@@ -51,11 +238,13 @@ def safe_move_file(
     dry_run: bool = True, 
     reason: str = "", 
     safe_mode: bool = True,
-    progress_callback: Optional[Callable[[str], None]] = None
+    progress_callback: Optional[Callable[[str], None]] = None,
+    reserved: Optional[NameReservations] = None
 ) -> dict:
     """
     Moves a file safely.
     If safe_mode is True: Copy -> Verify -> Delete.
+    Pass reserved when moves run concurrently (see run_moves_parallel).
     """
     if not src.exists():
         return {"status": "skipped", "reason": "Source not found", "file": src.name}
@@ -63,7 +252,7 @@ def safe_move_file(
     try:
         # Determine destination path
         dest_dir.mkdir(parents=True, exist_ok=True)
-        dest_path = get_unique_path(dest_dir, src.name)
+        dest_path = get_unique_path(dest_dir, src.name, reserved)
         
         if dry_run:
             logger.info(f"[DRY RUN] Move: {src.name} -> {dest_path.name} ({reason})")
@@ -81,13 +270,12 @@ def safe_move_file(
             raise OSError("Insufficient disk space")
 
         if safe_mode:
-            # COPY
+            # COPY (source is hashed while it is copied)
             if progress_callback: progress_callback("Copying...")
-            shutil.copy2(src, dest_path)
+            src_hash = _copy_and_hash(src, dest_path)
             
             # VERIFY
             if progress_callback: progress_callback("Verifying checksum...")
-            src_hash = calculate_checksum(src)
             dest_hash = calculate_checksum(dest_path)
             
             if src_hash != dest_hash:
@@ -124,3 +312,69 @@ def safe_move_file(
     except Exception as e:
         logger.error(f"[ERROR] Could not move {src.name}: {e}")
         return {"status": "error", "file": src.name, "error": str(e)}
+
+
+def run_moves_parallel(
+    moves: List[Tuple[Path, Path, str]],
+    dry_run: bool = True,
+    safe_mode: bool = True,
+    on_done: Optional[Callable[[int, int, dict], None]] = None,
+    should_abort: Optional[Callable[[], bool]] = None,
+    max_workers: int = MOVE_WORKERS
+) -> Tuple[dict, bool]:
+    """
+    Runs safe_move_file for each (src, dest_dir, reason) on a thread pool.
+    At most 2 * max_workers moves are queued or running at a time; the next
+    one is submitted as each finishes.
+    on_done(completed, index, result) is called on this thread as each move
+    finishes. should_abort is polled after every completion; when it returns
+    True, no further moves are started.
+    Returns (details table in the order of moves, aborted). After an abort
+    only the moves that actually ran are included.
+    """
+    reserved = NameReservations()
+    # Kept as tuples of DETAIL_FIELDS until the end; far smaller than the result dicts
+    results: List[Optional[tuple]] = [None] * len(moves)
+    aborted = False
+    completed = 0
+    max_inflight = 2 * max_workers
+    pending = iter(enumerate(moves))
+    inflight = {}  # future -> index into moves
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def fill():
+            while len(inflight) < max_inflight:
+                item = next(pending, None)
+                if item is None:
+                    return
+                index, (src, dest_dir, reason) = item
+                inflight[executor.submit(safe_move_file, src, dest_dir, dry_run, reason, safe_mode, None, reserved)] = index
+        
+        fill()
+        while inflight and not aborted:
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = inflight.pop(future)
+                res = future.result()
+                results[index] = tuple(res.get(field) for field in DETAIL_FIELDS)
+                completed += 1
+                if on_done:
+                    on_done(completed, index, res)
+                if should_abort and should_abort():
+                    aborted = True
+                    break
+            if not aborted:
+                fill()
+        
+        if aborted:
+            for future in inflight:
+                future.cancel()
+            # Moves already running when the abort came still finish; record them
+            for future, index in inflight.items():
+                if not future.cancelled():
+                    res = future.result()
+                    results[index] = tuple(res.get(field) for field in DETAIL_FIELDS)
+    
+    rows = [row for row in results if row is not None]
+    columns = zip(*rows) if rows else [()] * len(DETAIL_FIELDS)
+    return {field: list(column) for field, column in zip(DETAIL_FIELDS, columns)}, aborted
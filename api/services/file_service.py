@@ -1,8 +1,41 @@
+import os
+import sqlite3
+import threading
+from itertools import groupby
 from pathlib import Path
-from collections import defaultdict
-from services.core_logic import safe_move_file, logger
+import orjson
+from config import get_settings
+from services.core_logic import run_moves_parallel, new_details, iter_files, map_subtrees, file_suffix, logger
 from services.job_manager import job_manager
 
+SKIP_DIRS = frozenset({'Windows', 'Program Files', 'Program Files (x86)', '$Recycle.Bin', 'System Volume Information', 'AppData'})
+
+FILE_CATEGORIES = {
+    'Software Installers': {'.exe', '.msi', '.iso'},
+    'Archives': {'.zip', '.rar', '.7z', '.tar.gz', '.tgz', '.gz'}
+}
+
+# Inverted FILE_CATEGORIES for a single lookup per file
+EXT_TO_CATEGORY = {ext: cat for cat, exts in FILE_CATEGORIES.items() for ext in exts}
+
+# Multi-part extensions like '.tar.gz', which a plain suffix ('.gz') never matches
+COMPOUND_EXTS = tuple(ext for ext in EXT_TO_CATEGORY if ext.count('.') > 1)
+
+# Every categorized extension, so most files are rejected by one str.endswith()
+CATEGORY_TAILS = tuple(EXT_TO_CATEGORY)
+
+
+def _file_category(name: str):
+    """Category for a file name, checking compound extensions before the suffix."""
+    lower = name.lower()
+    if not lower.endswith(CATEGORY_TAILS):
+        return None
+    if lower.endswith(COMPOUND_EXTS):
+        for ext in COMPOUND_EXTS:
+            if lower.endswith(ext):
+                return EXT_TO_CATEGORY[ext]
+    return EXT_TO_CATEGORY.get(file_suffix(lower))
+
 
 def collect_pdfs(source_dir: str, dest_dir: str, dry_run: bool = True, job_id: str = None, safe_mode: bool = True):
     """
@@ -11,18 +44,22 @@ def collect_pdfs(source_dir: str, dest_dir: str, dry_run: bool = True, job_id: s
     """
     source = Path(source_dir)
     dest = Path(dest_dir)
-    results = {"moved": 0, "errors": 0, "details": []}
-
-    SKIP_DIRS = {'Windows', 'Program Files', 'Program Files (x86)', '$Recycle.Bin', 'System Volume Information', 'AppData'}
+    results = {"moved": 0, "errors": 0, "details": new_details()}
     
     # First pass: collect all PDFs
     all_files = []
-    for path in source.rglob('*.pdf'):
-        if not path.is_file():
-            continue
-        if any(part in SKIP_DIRS for part in path.parts):
+    dest_resolved = dest.resolve()
+    in_dest = {}  # parent dir -> whether it resolves to dest (resolve once per folder)
+    for entry in iter_files(source, skip_dirs=SKIP_DIRS):
+        # normcase keeps the platform's case rules for the *.pdf match
+        if not os.path.normcase(entry.name).endswith('.pdf'):
             continue
-        if path.parent.resolve() == dest.resolve():
+        path = Path(entry.path)
+        parent = path.parent
+        skip = in_dest.get(parent)
+        if skip is None:
+            skip = in_dest[parent] = parent.resolve() == dest_resolved
+        if skip:
             continue
         all_files.append(path)
     
@@ -31,41 +68,31 @@ def collect_pdfs(source_dir: str, dest_dir: str, dry_run: bool = True, job_id: s
     if job_id:
         job_manager.start_job(job_id, total)
     
-    # Helper
-    def progress_callback(msg: str):
-        if job_id:
-            job_manager.update_progress(
-                job_id, 
-                current=i+1, 
-                total=total, 
-                message=msg, 
-                current_file=path.name
-            )
-
-    for i, path in enumerate(all_files):
-        # Check for abort
-        if job_id and job_manager.is_aborted(job_id):
-            results["aborted"] = True
-            results["message"] = f"Aborted after processing {i} of {total} files"
-            job_manager.mark_aborted(job_id, results)
-            return results
-            
-        res = safe_move_file(path, dest, dry_run, "Consolidate PDF", safe_mode, progress_callback)
-        results["details"].append(res)
-        
-        if res.get("status") in ["moved", "dry_run"]:
-            results["moved"] += 1
-        
-        # Update progress
+    moves = [(path, dest, "Consolidate PDF") for path in all_files]
+    
+    # Moves run on a thread pool; progress advances as each one completes
+    def on_done(completed: int, index: int, res: dict):
         if job_id:
+            name = moves[index][0].name
             job_manager.update_progress(
                 job_id,
-                current=i + 1,
+                current=completed,
                 total=total,
-                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {path.name}",
-                current_file=path.name
+                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {name}",
+                current_file=name
             )
     
+    should_abort = (lambda: job_manager.is_aborted(job_id)) if job_id else None
+    details, aborted = run_moves_parallel(moves, dry_run, safe_mode, on_done, should_abort)
+    results["details"] = details
+    results["moved"] = sum(1 for status in details["status"] if status in ("moved", "dry_run"))
+    
+    if aborted:
+        results["aborted"] = True
+        results["message"] = f"Aborted after processing {len(details['status'])} of {total} files"
+        job_manager.mark_aborted(job_id, results)
+        return results
+    
     if job_id:
         job_manager.complete_job(job_id, results)
             
@@ -80,110 +107,212 @@ def organize_files_by_type(source_dir: str, dest_dir: str, dry_run: bool = True,
     source = Path(source_dir)
     dest = Path(dest_dir)
     
-    FILE_CATEGORIES = {
-        'Software Installers': {'.exe', '.msi', '.iso'},
-        'Archives': {'.zip', '.rar', '.7z', '.tar.gz', '.tgz', '.gz'}
-    }
-    
-    results = {"moved": 0, "errors": 0, "details": []}
+    results = {"moved": 0, "errors": 0, "details": new_details()}
     
     # First pass: collect files
     all_files = []
-    for path in source.rglob('*'):
-        if not path.is_file():
-            continue
-        ext = path.suffix.lower()
-        for cat, exts in FILE_CATEGORIES.items():
-            if ext in exts:
-                all_files.append((path, cat))
-                break
+    for entry in iter_files(source):
+        cat = _file_category(entry.name)
+        if cat:
+            all_files.append((Path(entry.path), cat))
     
     total = len(all_files)
     
     if job_id:
         job_manager.start_job(job_id, total)
     
-    # Helper
-    def progress_callback(msg: str):
-        if job_id:
-            job_manager.update_progress(
-                job_id, 
-                current=i+1, 
-                total=total, 
-                message=msg, 
-                current_file=path.name
-            )
-
-    for i, (path, category) in enumerate(all_files):
-        # Check for abort
-        if job_id and job_manager.is_aborted(job_id):
-            results["aborted"] = True
-            results["message"] = f"Aborted after processing {i} of {total} files"
-            job_manager.mark_aborted(job_id, results)
-            return results
-        
-        target_subfolder = dest / category
-        res = safe_move_file(path, target_subfolder, dry_run, category, safe_mode, progress_callback)
-        results["details"].append(res)
-        
-        if res.get("status") in ["moved", "dry_run"]:
-            results["moved"] += 1
-        
-        # Update progress
+    moves = [(path, dest / category, category) for path, category in all_files]
+    
+    # Moves run on a thread pool; progress advances as each one completes
+    def on_done(completed: int, index: int, res: dict):
         if job_id:
+            name = moves[index][0].name
             job_manager.update_progress(
                 job_id,
-                current=i + 1,
+                current=completed,
                 total=total,
-                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {path.name}",
-                current_file=path.name
+                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {name}",
+                current_file=name
             )
     
+    should_abort = (lambda: job_manager.is_aborted(job_id)) if job_id else None
+    details, aborted = run_moves_parallel(moves, dry_run, safe_mode, on_done, should_abort)
+    results["details"] = details
+    results["moved"] = sum(1 for status in details["status"] if status in ("moved", "dry_run"))
+    
+    if aborted:
+        results["aborted"] = True
+        results["message"] = f"Aborted after processing {len(details['status'])} of {total} files"
+        job_manager.mark_aborted(job_id, results)
+        return results
+    
     if job_id:
         job_manager.complete_job(job_id, results)
                 
     return results
 
 
+# analyze_extensions reports progress and polls for abort every N files
+SCAN_PROGRESS_INTERVAL = 1000
+
+
+def _extension_result(stats: dict) -> dict:
+    """Split {ext: [count, size]} into the counts/sizes dicts the API returns."""
+    return {
+        "counts": {ext: stat[0] for ext, stat in stats.items()},
+        "sizes": {ext: stat[1] for ext, stat in stats.items()},
+    }
+
+
+def _load_scan_index(db_path: str, root: str) -> dict:
+    """Cached {folder: (mtime_ns, {ext: [count, size]})} for folders at or below root."""
+    if not db_path:
+        return {}
+    try:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS dir_stats (path TEXT PRIMARY KEY, mtime_ns INTEGER, stats BLOB)")
+            prefix = os.path.join(root, '')
+            rows = conn.execute(
+                "SELECT path, mtime_ns, stats FROM dir_stats WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            ).fetchall()
+        return {path: (mtime_ns, orjson.loads(stats)) for path, mtime_ns, stats in rows}
+    except (OSError, sqlite3.Error, orjson.JSONDecodeError) as e:
+        logger.warning(f"Scan index unavailable, scanning without it: {e}")
+        return {}
+
+
+def _save_scan_index(db_path: str, root: str, rows: list):
+    """Replaces the cached folders under root with rows of (folder, mtime_ns, stats)."""
+    if not db_path:
+        return
+    try:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS dir_stats (path TEXT PRIMARY KEY, mtime_ns INTEGER, stats BLOB)")
+            prefix = os.path.join(root, '')
+            conn.execute(
+                "DELETE FROM dir_stats WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO dir_stats VALUES (?, ?, ?)",
+                ((path, mtime_ns, orjson.dumps(stats)) for path, mtime_ns, stats in rows)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update scan index: {e}")
+
 def analyze_extensions(source_dir: str, job_id: str = None):
     """
     Returns statistics of file extensions in the directory.
+    Top-level subtrees are scanned in parallel and their stats merged.
+    If the opt-in scan index (SCAN_INDEX_PATH) is set, per-folder stats are
+    kept in it: a folder whose mtime is unchanged since the last scan reuses
+    them instead of stat()ing its files. A file rewritten in place doesn't
+    touch its folder's mtime, so with the index on its size can lag until
+    something in that folder is added, removed or renamed.
     (No safe mode needed as it's read-only)
     """
-    source = Path(source_dir)
-    counts = defaultdict(int)
-    sizes = defaultdict(int)
-    
     if job_id:
         job_manager.start_job(job_id, 0)
         job_manager.update_progress(job_id, 0, 0, "Analyzing extensions...", "")
     
-    file_count = 0
-    for path in source.rglob('*'):
-        if not path.is_file():
-            continue
-        
-        # Check for abort
-        if job_id and job_manager.is_aborted(job_id):
-            result = {"counts": dict(counts), "sizes": dict(sizes), "aborted": True}
-            job_manager.mark_aborted(job_id, result)
-            return result
-        
-        ext = path.suffix.lower() or "No Extension"
-        counts[ext] += 1
-        sizes[ext] += path.stat().st_size
-        file_count += 1
-        
-        if job_id and file_count % 100 == 0:
+    source_dir = os.path.abspath(source_dir)
+    db_path = get_settings().resolved_scan_index_path
+    index = _load_scan_index(db_path, source_dir)
+    
+    aborted = threading.Event()
+    progress_lock = threading.Lock()
+    scanned = 0
+    
+    def report(count: int, name: str):
+        nonlocal scanned
+        with progress_lock:
+            scanned += count
             job_manager.update_progress(
                 job_id,
-                current=file_count,
-                total=file_count,
+                current=scanned,
+                total=scanned,
                 message="Scanning files...",
-                current_file=path.name
+                current_file=name
             )
     
-    result = {"counts": dict(counts), "sizes": dict(sizes)}
+    def scan(entries) -> list:
+        rows = []  # (folder, mtime_ns, {ext: [count, total size]}) per folder
+        file_count = 0
+        reported = 0
+        name = ""
+        if aborted.is_set():
+            return rows
+        # iter_files lists each folder in one go, so its files arrive contiguously
+        for folder, group in groupby(entries, key=lambda entry: os.path.dirname(entry.path)):
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            cached = index.get(folder)
+            if mtime_ns is not None and cached is not None and cached[0] == mtime_ns:
+                stats = cached[1]
+                file_count += sum(count for count, _ in stats.values())
+            else:
+                stats = {}
+                for entry in group:
+                    name = entry.name
+                    ext = file_suffix(name).lower() or "No Extension"
+                    stat = stats.get(ext)
+                    if stat is None:
+                        stat = stats[ext] = [0, 0]
+                    stat[0] += 1
+                    stat[1] += entry.stat().st_size
+                    file_count += 1
+                    
+                    if job_id and file_count - reported >= SCAN_PROGRESS_INTERVAL:
+                        # Check for abort
+                        if aborted.is_set() or job_manager.is_aborted(job_id):
+                            aborted.set()
+                            return rows
+                        report(file_count - reported, name)
+                        reported = file_count
+            rows.append((folder, mtime_ns, stats))
+            
+            if job_id and file_count - reported >= SCAN_PROGRESS_INTERVAL:
+                if aborted.is_set() or job_manager.is_aborted(job_id):
+                    aborted.set()
+                    return rows
+                report(file_count - reported, name or folder)
+                reported = file_count
+        
+        # Subtrees smaller than the interval still report and poll for abort
+        if job_id and not aborted.is_set():
+            if job_manager.is_aborted(job_id):
+                aborted.set()
+            elif file_count > reported:
+                report(file_count - reported, name)
+        return rows
+    
+    stats = {}
+    all_rows = []
+    for rows in map_subtrees(source_dir, scan):
+        all_rows.extend(rows)
+        for _, _, part in rows:
+            for ext, (count, size) in part.items():
+                stat = stats.get(ext)
+                if stat is None:
+                    stats[ext] = [count, size]
+                else:
+                    stat[0] += count
+                    stat[1] += size
+    
+    result = _extension_result(stats)
+    
+    if not aborted.is_set():
+        # Folders whose stat failed aren't cached
+        _save_scan_index(db_path, source_dir, [row for row in all_rows if row[1] is not None])
+    
+    if aborted.is_set():
+        result["aborted"] = True
+        job_manager.mark_aborted(job_id, result)
+        return result
     
     if job_id:
         job_manager.complete_job(job_id, result)
@@ -2,6 +2,7 @@
 Job Manager - Thread-safe job tracking for async operations.
 Enables progress tracking, abort functionality, and SSE streaming.
 """
+import asyncio
 import threading
 import uuid
 from datetime import datetime
@@ -9,6 +10,8 @@ from typing import Dict, Optional, Any, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
+import orjson
+
 
 class JobStatus(str, Enum):
     PENDING = "pending"
@@ -18,6 +21,10 @@ class JobStatus(str, Enum):
     FAILED = "failed"
 
 
+# Statuses after which a job never changes again
+TERMINAL_STATES = frozenset({JobStatus.COMPLETED, JobStatus.ABORTED, JobStatus.FAILED})
+
+
 @dataclass
 class JobState:
     id: str
@@ -31,6 +38,18 @@ class JobState:
     started_at: datetime = field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
+    version: int = field(default=0, repr=False)  # Bumped on every mutation
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)  # Guards this job's fields
+    _sse_version: int = field(default=-1, init=False, repr=False, compare=False)
+    _sse_payload: bytes = field(default=b"", init=False, repr=False, compare=False)
+    
+    def sse_payload(self) -> bytes:
+        """SSE data frame for the current state, serialized once per version."""
+        if self._sse_version != self.version:
+            with self.lock:
+                self._sse_version = self.version
+                self._sse_payload = b"data: " + orjson.dumps(self.to_dict()) + b"\n\n"
+        return self._sse_payload
     
     def to_dict(self) -> dict:
         return {
@@ -49,7 +68,12 @@ class JobState:
 
 
 class JobManager:
-    """Thread-safe singleton for managing job state across the application."""
+    """
+    Thread-safe singleton for managing job state across the application.
+    _registry_lock only guards adding to the job/listener registries; each
+    job's fields are updated under its own JobState.lock, so concurrent jobs
+    never contend with each other. Lookups are plain (atomic) dict reads.
+    """
     
     _instance: Optional['JobManager'] = None
     _lock = threading.Lock()
@@ -60,27 +84,66 @@ class JobManager:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._jobs: Dict[str, JobState] = {}
-                    cls._instance._abort_flags: Dict[str, bool] = {}
-                    cls._instance._job_lock = threading.Lock()
+                    cls._instance._abort_flags: Dict[str, threading.Event] = {}
+                    cls._instance._registry_lock = threading.Lock()
+                    cls._instance._listeners: Dict[str, Dict[asyncio.Event, asyncio.AbstractEventLoop]] = {}
         return cls._instance
     
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """
+        Register an async listener for a job. The returned event is set
+        (from whichever thread mutates the job) every time its state changes.
+        Must be called from a running event loop.
+        """
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        with self._registry_lock:
+            self._listeners.setdefault(job_id, {})[event] = loop
+        return event
+    
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        """Remove a listener registered with subscribe()."""
+        with self._registry_lock:
+            listeners = self._listeners.get(job_id)
+            if listeners is not None:
+                listeners.pop(event, None)
+                if not listeners:
+                    del self._listeners[job_id]
+    
+    def _mark_changed(self, job: JobState):
+        """Bump a job's version and wake its listeners. Caller must hold job.lock."""
+        job.version += 1
+        listeners = self._listeners.get(job.id)
+        if not listeners:
+            return
+        # Snapshot: subscribe/unsubscribe may change the dict from another thread
+        for event, loop in tuple(listeners.items()):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+    
     def create_job(self, job_type: str) -> str:
         """Create a new job and return its ID."""
         job_id = str(uuid.uuid4())[:8]
-        with self._job_lock:
+        with self._registry_lock:
             self._jobs[job_id] = JobState(id=job_id, job_type=job_type)
-            self._abort_flags[job_id] = False
+            self._abort_flags[job_id] = threading.Event()
         return job_id
     
     def get_job(self, job_id: str) -> Optional[JobState]:
         """Get job state by ID."""
-        with self._job_lock:
-            return self._jobs.get(job_id)
+        return self._jobs.get(job_id)
     
     def get_all_jobs(self) -> list:
         """Get all jobs as dicts."""
-        with self._job_lock:
-            return [job.to_dict() for job in self._jobs.values()]
+        with self._registry_lock:
+            jobs = list(self._jobs.values())
+        result = []
+        for job in jobs:
+            with job.lock:
+                result.append(job.to_dict())
+        return result
     
     def update_progress(
         self, 
@@ -91,71 +154,95 @@ class JobManager:
         current_file: str = ""
     ):
         """Update job progress. Called from within service loops."""
-        with self._job_lock:
-            job = self._jobs.get(job_id)
-            if job and job.status == JobStatus.RUNNING:
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
+                if job.status != JobStatus.RUNNING:
+                    return
                 job.current = current
                 job.total = total
                 job.progress = int((current / total) * 100) if total > 0 else 0
                 job.message = message
                 job.current_file = current_file
+                self._mark_changed(job)
     
     def start_job(self, job_id: str, total: int = 0):
         """Mark job as running."""
-        with self._job_lock:
-            job = self._jobs.get(job_id)
-            if job:
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
                 job.status = JobStatus.RUNNING
                 job.total = total
                 job.message = "Processing..."
+                self._mark_changed(job)
     
     def complete_job(self, job_id: str, result: dict):
         """Mark job as completed with results."""
-        with self._job_lock:
-            job = self._jobs.get(job_id)
-            if job:
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
                 job.status = JobStatus.COMPLETED
                 job.progress = 100
                 job.completed_at = datetime.now()
                 job.result = result
                 job.message = "Completed successfully"
+                self._mark_changed(job)
     
     def fail_job(self, job_id: str, error: str):
         """Mark job as failed."""
-        with self._job_lock:
-            job = self._jobs.get(job_id)
-            if job:
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
                 job.status = JobStatus.FAILED
                 job.completed_at = datetime.now()
                 job.message = f"Failed: {error}"
                 job.result = {"error": error}
+                self._mark_changed(job)
     
     def abort_job(self, job_id: str) -> bool:
         """Request job abortion. Returns True if job exists."""
-        with self._job_lock:
-            if job_id in self._abort_flags:
-                self._abort_flags[job_id] = True
-                job = self._jobs.get(job_id)
-                if job:
-                    job.message = "Abort requested..."
-                return True
+        flag = self._abort_flags.get(job_id)
+        if flag is None:
             return False
+        flag.set()
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
+                job.message = "Abort requested..."
+                self._mark_changed(job)
+        return True
     
     def is_aborted(self, job_id: str) -> bool:
-        """Check if abort was requested for this job."""
-        with self._job_lock:
-            return self._abort_flags.get(job_id, False)
+        """
+        Check if abort was requested for this job.
+        Lock-free: workers poll this per file, and dict.get() plus
+        Event.is_set() are each atomic.
+        """
+        flag = self._abort_flags.get(job_id)
+        return flag is not None and flag.is_set()
     
     def mark_aborted(self, job_id: str, result: dict):
         """Mark job as aborted with partial results."""
-        with self._job_lock:
-            job = self._jobs.get(job_id)
-            if job:
+        job = self._jobs.get(job_id)
+        if job:
+            with job.lock:
                 job.status = JobStatus.ABORTED
                 job.completed_at = datetime.now()
                 job.message = "Operation aborted by user"
                 job.result = result
+                self._mark_changed(job)
 
 
 # Global instance
 job_manager = JobManager()
+
+
+def run_in_job(job_id: str, fn: Callable, /, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) as the body of a background job.
+    Any uncaught exception marks the job as failed.
+    """
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        job_manager.fail_job(job_id, str(e))
@@ -1,6 +1,8 @@
+import os
+import re
+import time
 from pathlib import Path
-from datetime import datetime
-from services.core_logic import safe_move_file, logger
+from services.core_logic import safe_move_file, run_moves_parallel, NameReservations, new_details, append_detail, map_subtrees, logger
 from services.job_manager import job_manager
 
 MEDIA_EXTENSIONS = {
@@ -9,6 +11,72 @@ MEDIA_EXTENSIONS = {
     '.gif', '.png', '.arw', '.cr2', '.nef' # Misc/Raw
 }
 
+# For a single C-level str.endswith() test per name instead of building a suffix
+_MEDIA_TAILS = tuple(MEDIA_EXTENSIONS)
+
+# YYYY-MM / YYYYMM folders produced by organize_media_by_date
+_DATE_FOLDER_RE = re.compile(r'(19|20)\d{2}-?(0[1-9]|1[0-2])')
+
+# Local-date strings cached per 15-minute bucket of mtime. Current UTC offsets and
+# DST shifts are multiples of 15 minutes, so all times in a bucket share a local day.
+_DATE_BUCKET_SECONDS = 900
+_DATE_CACHE_MAX = 100_000
+_date_cache = {}
+
+# Moves are ordered by inode, a rough proxy for on-disk location on ext4/XFS-style
+# filesystems. On Windows DirEntry.inode() costs a stat per file, so order is kept.
+_SORT_BY_INODE = os.name != 'nt'
+
+# organize_media_by_date publishes progress at most every PROGRESS_EVERY files
+# or PROGRESS_INTERVAL seconds, whichever comes first
+PROGRESS_EVERY = 64
+PROGRESS_INTERVAL = 0.1
+
+
+def _local_date_parts(mtime: float) -> tuple:
+    """Returns ("YYYY-MM", "DD") for a timestamp in local time."""
+    bucket = int(mtime // _DATE_BUCKET_SECONDS)
+    parts = _date_cache.get(bucket)
+    if parts is None:
+        tm = time.localtime(mtime)
+        parts = (f"{tm.tm_year:04d}-{tm.tm_mon:02d}", f"{tm.tm_mday:02d}")
+        if len(_date_cache) >= _DATE_CACHE_MAX:
+            _date_cache.clear()
+        _date_cache[bucket] = parts
+    return parts
+
+
+def _is_media_name(name: str) -> bool:
+    """True if a lower-cased file name has a MEDIA_EXTENSIONS suffix (dotfiles like '.jpg' excluded)."""
+    return name.endswith(_MEDIA_TAILS) and name.rfind('.') > 0
+
+
+def _plan_media_move(entry, dest: Path, name: str, targets: dict) -> tuple:
+    """
+    Returns (path, target folder, reason) for a media file's DirEntry; name is
+    lower-cased. targets caches (folder Path, reason) per subfolder name, so
+    files going to the same month share one Path instead of building their own.
+    """
+    if 'screenshot' in name or name.endswith('.png'):
+        key = "Screenshots"
+    else:
+        # Date based
+        try:
+            key = _local_date_parts(entry.stat().st_mtime)[0]
+        except Exception:
+            key = "Unknown_Date"
+    
+    target = targets.get(key)
+    if target is None:
+        if key == "Screenshots":
+            reason = "Screenshot detected"
+        elif key == "Unknown_Date":
+            reason = "Date extraction failed"
+        else:
+            reason = f"Media File ({key})"
+        target = targets[key] = (dest / key, reason)
+    return Path(entry.path), target[0], target[1]
+
 
 def organize_media_by_date(source_dir: str, dest_dir: str, dry_run: bool = True, job_id: str = None, safe_mode: bool = True):
     """
@@ -23,82 +91,77 @@ def organize_media_by_date(source_dir: str, dest_dir: str, dry_run: bool = True,
             job_manager.fail_job(job_id, "Source directory not found")
         return {"error": "Source directory not found"}
 
-    results = {"moved": 0, "errors": 0, "skipped": 0, "details": []}
+    results = {"moved": 0, "errors": 0, "skipped": 0, "details": new_details()}
     
-    # First pass: count total files
-    all_files = []
-    for path in source.rglob('*'):
-        if not path.is_file():
-            continue
-        ext = path.suffix.lower()
-        if ext in MEDIA_EXTENSIONS:
-            all_files.append(path)
+    # Single walk: each media file is classified as it is listed (top-level
+    # subtrees in parallel), using the stat already cached on its DirEntry.
+    # The list is kept so moves into dest can't be re-walked and total is known.
+    targets = {}
+    
+    def plan_moves(entries) -> list:
+        return [
+            (entry.inode() if _SORT_BY_INODE else 0, _plan_media_move(entry, dest, name, targets))
+            for entry in entries
+            if _is_media_name(name := entry.name.lower())
+        ]
+
+    planned = []
+    for part in map_subtrees(source, plan_moves):
+        planned.extend(part)
+    if _SORT_BY_INODE:
+        # inode() comes from readdir on POSIX, so this costs no extra syscalls
+        planned.sort(key=lambda item: item[0])
+    all_files = [plan for _, plan in planned]
     
     total = len(all_files)
     
     if job_id:
         job_manager.start_job(job_id, total)
     
-    # Helper for progress tracking inside safe_move
-    def progress_callback(msg: str):
-        if job_id:
+    # Progress is published every PROGRESS_EVERY files or PROGRESS_INTERVAL
+    # seconds (and always for the last file) rather than once per step
+    last_update = 0.0
+    
+    def publish(current: int, message: str, name: str, force: bool = False):
+        nonlocal last_update
+        now = time.monotonic()
+        if force or now - last_update >= PROGRESS_INTERVAL:
+            last_update = now
             job_manager.update_progress(
-                job_id, 
-                current=i+1, 
-                total=total, 
-                message=msg, 
-                current_file=path.name
+                job_id,
+                current=current,
+                total=total,
+                message=message,
+                current_file=name
             )
-
-    for i, path in enumerate(all_files):
-        # Check for abort
-        if job_id and job_manager.is_aborted(job_id):
-            results["aborted"] = True
-            results["message"] = f"Aborted after processing {i} of {total} files"
-            job_manager.mark_aborted(job_id, results)
-            return results
-        
-        ext = path.suffix.lower()
-        name = path.name.lower()
-        
-        # Determine Target
-        target_subfolder = None
-        reason = ""
-        
-        if 'screenshot' in name or ext == '.png':
-            target_subfolder = dest / "Screenshots"
-            reason = "Screenshot detected"
-        else:
-            # Date based
-            try:
-                mtime = path.stat().st_mtime
-                date_str = datetime.fromtimestamp(mtime).strftime('%Y-%m')
-                target_subfolder = dest / date_str
-                reason = f"Media File ({date_str})"
-            except Exception:
-                target_subfolder = dest / "Unknown_Date"
-                reason = "Date extraction failed"
-        
-        # Execute
-        res = safe_move_file(path, target_subfolder, dry_run, reason, safe_mode, progress_callback)
-        results["details"].append(res)
-        
-        if res.get("status") in ["moved", "dry_run"]:
+    
+    # Moves run on a bounded thread pool so one file's copy overlaps the next
+    def on_done(completed: int, index: int, res: dict):
+        if job_id:
+            name = all_files[index][0].name
+            publish(
+                completed,
+                f"{'[DRY RUN] ' if dry_run else ''}Processed {name}",
+                name,
+                force=(completed - 1) % PROGRESS_EVERY == 0 or completed == total
+            )
+    
+    should_abort = (lambda: job_manager.is_aborted(job_id)) if job_id else None
+    details, aborted = run_moves_parallel(all_files, dry_run, safe_mode, on_done, should_abort)
+    results["details"] = details
+    for status in details["status"]:
+        if status in ("moved", "dry_run"):
             results["moved"] += 1
-        elif res.get("status") == "error":
+        elif status == "error":
             results["errors"] += 1
         else:
             results["skipped"] += 1
-        
-        # Update progress (final)
-        if job_id:
-            job_manager.update_progress(
-                job_id,
-                current=i + 1,
-                total=total,
-                message=f"{'[DRY RUN] ' if dry_run else ''}Processed {path.name}",
-                current_file=path.name
-            )
+    
+    if aborted:
+        results["aborted"] = True
+        results["message"] = f"Aborted after processing {len(details['status'])} of {total} files"
+        job_manager.mark_aborted(job_id, results)
+        return results
     
     # Complete job
     if job_id:
@@ -112,22 +175,18 @@ def organize_expanded_dates(root_dir: str, dry_run: bool = True, job_id: str = N
     Scans YYYY-MM folders and moves files into DD subfolders.
     Supports job tracking and abort functionality.
     """
-    import re
-    
     root = Path(root_dir)
     if not root.exists():
         if job_id:
             job_manager.fail_job(job_id, "Root directory not found")
         return {"error": "Root directory not found"}
         
-    date_folder_pattern = re.compile(r'^(19|20)\d{2}-?(0[1-9]|1[0-2])$')
-    
-    results = {"moved": 0, "errors": 0, "details": []}
+    results = {"moved": 0, "errors": 0, "details": new_details()}
     
     # Identify date folders and collect files
     all_files = []
     for item in root.iterdir():
-        if item.is_dir() and date_folder_pattern.match(item.name):
+        if item.is_dir() and _DATE_FOLDER_RE.fullmatch(item.name):
             for file_path in item.iterdir():
                 if file_path.is_file() and not file_path.name.startswith('.'):
                     all_files.append((item, file_path))
@@ -148,6 +207,11 @@ def organize_expanded_dates(root_dir: str, dry_run: bool = True, job_id: str = N
                 current_file=file_path.name
             )
 
+    # Resolves name collisions per destination folder from one listing
+    reserved = NameReservations()
+    # (month folder, day) -> (day folder Path, reason), built once per day
+    day_targets = {}
+
     for i, (folder, file_path) in enumerate(all_files):
         # Check for abort
         if job_id and job_manager.is_aborted(job_id):
@@ -158,11 +222,13 @@ def organize_expanded_dates(root_dir: str, dry_run: bool = True, job_id: str = N
             
         try:
             mtime = file_path.stat().st_mtime
-            day_str = datetime.fromtimestamp(mtime).strftime("%d")
+            day_str = _local_date_parts(mtime)[1]
             
-            day_folder = folder / day_str
-            res = safe_move_file(file_path, day_folder, dry_run, f"Day {day_str}", safe_mode, progress_callback)
-            results["details"].append(res)
+            day_target = day_targets.get((folder, day_str))
+            if day_target is None:
+                day_target = day_targets[(folder, day_str)] = (folder / day_str, f"Day {day_str}")
+            res = safe_move_file(file_path, day_target[0], dry_run, day_target[1], safe_mode, progress_callback, reserved)
+            append_detail(results["details"], res)
             
             if res.get("status") in ["moved", "dry_run"]:
                 results["moved"] += 1
@@ -105,6 +105,15 @@ const elements = {
 // API Functions
 // ========================================
 
+// FastAPI sends a string detail for HTTPException and a list of
+// {loc, msg} objects for request validation errors (422)
+function formatErrorDetail(detail) {
+    if (Array.isArray(detail)) {
+        return detail.map(err => (err.msg || JSON.stringify(err)).replace(/^Value error, /, '')).join('; ');
+    }
+    return typeof detail === 'string' ? detail : '';
+}
+
 async function apiRequest(endpoint, method = 'GET', body = null) {
     const options = {
         method,
@@ -121,7 +130,7 @@ async function apiRequest(endpoint, method = 'GET', body = null) {
 
     if (!response.ok) {
         const error = await response.json().catch(() => ({ detail: 'Request failed' }));
-        throw new Error(error.detail || 'Request failed');
+        throw new Error(formatErrorDetail(error.detail) || 'Request failed');
     }
 
     return response.json();
@@ -288,16 +297,37 @@ function showResults(data) {
     state.startTime = null;
 }
 
+// Move results arrive column-oriented ({status: [...], src: [...], ...});
+// rebuild row objects for the first `limit` entries only
+function detailRows(details, limit) {
+    if (Array.isArray(details)) return details.slice(0, limit);
+    const fields = Object.keys(details);
+    const count = Math.min(limit, details.status.length);
+    const rows = [];
+    for (let i = 0; i < count; i++) {
+        const row = {};
+        for (const field of fields) row[field] = details[field][i];
+        rows.push(row);
+    }
+    return rows;
+}
+
+function detailCount(details) {
+    if (!details) return 0;
+    return Array.isArray(details) ? details.length : (details.status || []).length;
+}
+
 function renderDetails(result) {
-    if (result.details && result.details.length > 0) {
-        const html = result.details.slice(0, 100).map(d => {
+    const total = detailCount(result.details);
+    if (total > 0) {
+        const html = detailRows(result.details, 100).map(d => {
             const icon = d.status === 'moved' ? '✓' : d.status === 'dry_run' ? '👁' : '✗';
             const color = d.status === 'error' ? 'var(--danger)' : d.status === 'moved' ? 'var(--success)' : 'inherit';
             const file = d.src ? d.src.split(/[/\\]/).pop() : d.file || 'unknown';
             return `<div style="color:${color}; margin-bottom:4px;">[${icon}] ${file}<br><span style="color:var(--text-muted); font-size:0.8em; margin-left:1.5em;">${d.reason || ''} (${d.mode || 'standard'})</span></div>`;
         }).join('');
         elements.detailsContent.innerHTML = html;
-        if (result.details.length > 100) elements.detailsContent.innerHTML += '...more...';
+        if (total > 100) elements.detailsContent.innerHTML += '...more...';
     } else if (result.counts) {
         // Analysis result
         const html = Object.entries(result.counts)
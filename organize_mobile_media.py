@@ -1,30 +1,58 @@
 import os
+import errno
 import shutil
 import argparse
 import sys
 from datetime import datetime
 
-def get_unique_filename(directory, filename):
+from scripts.fs_helpers import split_ext
+
+# Common system directories to skip (lower-case names; dot folders are skipped too)
+SKIP_DIRS = frozenset({
+    'windows', 'program files', 'program files (x86)', '$recycle.bin',
+    'system volume information', 'appdata', '.git', '.vs', '__pycache__',
+    'auto back up', 'autobackup'
+})
+
+def get_unique_filename(directory, filename, dir_names=None, next_counter=None):
     """
     Generates a unique filename if the file already exists in the destination.
     Appends _1, _2, etc. to the filename.
+    dir_names and next_counter are dicts kept across calls for one run: the
+    directory is listed once and each name resumes counting after its last
+    collision, so repeated duplicates no longer re-probe _1, _2, ... each time.
     """
-    name, ext = os.path.splitext(filename)
+    name, ext = split_ext(filename)
     counter = 1
     new_filename = filename
     
-    while os.path.exists(os.path.join(directory, new_filename)):
+    if dir_names is None:
+        while os.path.exists(os.path.join(directory, new_filename)):
+            new_filename = f"{name}_{counter}{ext}"
+            counter += 1
+        return new_filename
+    
+    names = dir_names.get(directory)
+    if names is None:
+        names = dir_names[directory] = set(os.listdir(directory))
+    key = (directory, filename)
+    counter = next_counter.get(key, 1)
+    # The listing may be stale (files moved in since), so the pick is confirmed with one stat
+    while new_filename in names or os.path.exists(os.path.join(directory, new_filename)):
+        names.add(new_filename)
         new_filename = f"{name}_{counter}{ext}"
         counter += 1
-        
+    names.add(new_filename)
+    next_counter[key] = counter
     return new_filename
 
-def get_date_taken(path):
+def get_date_taken(path, dir_fd=None):
     """
     Attempts to get the date taken from the file's modification time.
+    With dir_fd, path is a name relative to that open directory.
     """
     try:
-        stats = os.stat(path)
+        stats = os.stat(path, dir_fd=dir_fd)
         timestamp = min(stats.st_ctime, stats.st_mtime)
         return datetime.fromtimestamp(timestamp)
     except Exception:
@@ -55,8 +83,15 @@ def organize_mobile_media(source_dir, dest_base_dir):
     # Normalize paths
     source_dir = os.path.abspath(source_dir)
     dest_base_dir = os.path.abspath(dest_base_dir)
+    # Both paths are absolute, so "inside the destination" is a prefix test
+    dest_key = os.path.normcase(dest_base_dir)
+    dest_prefix = os.path.join(dest_key, '')
     screenshots_dir = os.path.join(dest_base_dir, "Screenshots")
 
+    # Same filesystem: a move is a single rename(2), no need for shutil.move
+    os.makedirs(dest_base_dir, exist_ok=True)
+    same_fs = os.stat(source_dir).st_dev == os.stat(dest_base_dir).st_dev
+
     print(f"Scanning: {source_dir}")
     print(f"MOVING to: {dest_base_dir}")
     print("Strategy: Photos/Videos -> YYYY-MM folders | PNGs -> 'Screenshots' folder")
@@ -69,71 +104,111 @@ def organize_mobile_media(source_dir, dest_base_dir):
         'errors': 0
     }
     
-    # Common system directories to skip
-    SKIP_DIRS = {
-        'windows', 'program files', 'program files (x86)', '$recycle.bin', 
-        'system volume information', 'appdata', '.git', '.vs', '__pycache__',
-        'auto back up', 'autobackup'
-    }
+    # Per-file lines are buffered and written OUTPUT_BATCH at a time rather than
+    # one locked, line-buffered print() per file
+    OUTPUT_BATCH = 256
+    output = []
 
-    for root, dirs, files in os.walk(source_dir, topdown=True):
-        dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS and not d.startswith('.')]
-        
-        if os.path.commonpath([dest_base_dir, root]) == dest_base_dir:
-            continue
+    def flush_output():
+        if output:
+            sys.stdout.write("\n".join(output) + "\n")
+            output.clear()
+
+    # Target folders already created this run (skips a stat per file)
+    created_dirs = set()
+    # Collision state for get_unique_filename
+    dir_names = {}
+    next_counter = {}
+
+    # os.fwalk keeps each directory open, so per-file stats are fstatat calls
+    # relative to it instead of full path lookups (not available on Windows)
+    if hasattr(os, 'fwalk'):
+        walker = os.fwalk(source_dir, topdown=True)
+    else:
+        walker = ((root, dirs, files, None) for root, dirs, files in os.walk(source_dir, topdown=True))
 
-        for file in files:
-            name, ext = os.path.splitext(file)
-            ext_lower = ext.lower()
+    try:
+        for root, dirs, files, dir_fd in walker:
+            # Only true when the source itself lies inside the destination
+            root_key = os.path.normcase(root)
+            if root_key == dest_key or root_key.startswith(dest_prefix):
+                dirs[:] = []
+                continue
+
+            # Never descend into the destination
+            dirs[:] = [d for d in dirs if d[:1] != '.' and d.lower() not in SKIP_DIRS
+                       and os.path.normcase(os.path.join(root, d)) != dest_key]
+
+            for file in files:
+                name, ext = split_ext(file)
+                ext_lower = ext.lower()
             
-            target_dir = None
-            is_screenshot = False
+                target_dir = None
+                is_screenshot = False
             
-            # Determine Category
-            if 'screenshot' in name.lower() or ext_lower in SCREENSHOT_EXTENSIONS:
-                target_dir = screenshots_dir
-                is_screenshot = True
-            elif ext_lower in MEDIA_EXTENSIONS:
-                # Date based
+                # Determine Category
+                if 'screenshot' in name.lower() or ext_lower in SCREENSHOT_EXTENSIONS:
+                    target_dir = screenshots_dir
+                    is_screenshot = True
+                elif ext_lower in MEDIA_EXTENSIONS:
+                    # Date based
+                    if dir_fd is not None:
+                        date_obj = get_date_taken(file, dir_fd)
+                    else:
+                        date_obj = get_date_taken(os.path.join(root, file))
+                    folder_name = date_obj.strftime("%Y-%m")
+                    target_dir = os.path.join(dest_base_dir, folder_name)
+                else:
+                    continue # Skip other files
+
+                # Process Move
                 source_path = os.path.join(root, file)
-                date_obj = get_date_taken(source_path)
-                folder_name = date_obj.strftime("%Y-%m")
-                target_dir = os.path.join(dest_base_dir, folder_name)
-            else:
-                continue # Skip other files
-
-            # Process Move
-            source_path = os.path.join(root, file)
             
-            try:
-                if not os.path.exists(target_dir):
-                    os.makedirs(target_dir)
+                try:
+                    if target_dir not in created_dirs:
+                        os.makedirs(target_dir, exist_ok=True)
+                        created_dirs.add(target_dir)
 
-                target_filename = file
-                target_path = os.path.join(target_dir, target_filename)
-
-                # Collision check - ALWAYS RENAME if exists
-                if os.path.exists(target_path):
-                    target_filename = get_unique_filename(target_dir, file)
+                    target_filename = file
                     target_path = os.path.join(target_dir, target_filename)
 
-                shutil.move(source_path, target_path)
+                    # Collision check - ALWAYS RENAME if exists
+                    if os.path.exists(target_path):
+                        target_filename = get_unique_filename(target_dir, file, dir_names, next_counter)
+                        target_path = os.path.join(target_dir, target_filename)
+
+                    if same_fs:
+                        try:
+                            os.replace(source_path, target_path)
+                        except OSError as e:
+                            # A mount point inside the source tree
+                            if e.errno != errno.EXDEV:
+                                raise
+                            shutil.move(source_path, target_path)
+                    else:
+                        shutil.move(source_path, target_path)
                 
-                type_label = "Screenshot" if is_screenshot else "Media"
-                dest_rel = os.path.relpath(target_path, dest_base_dir)
-                print(f"Moved [{type_label}]: {file} -> {dest_rel}")
+                    type_label = "Screenshot" if is_screenshot else "Media"
+                    dest_rel = os.path.relpath(target_path, dest_base_dir)
+                    output.append(f"Moved [{type_label}]: {file} -> {dest_rel}")
                 
-                if is_screenshot:
-                    counters['screenshots'] += 1
-                else:
-                    counters['photos_videos'] += 1
+                    if is_screenshot:
+                        counters['screenshots'] += 1
+                    else:
+                        counters['photos_videos'] += 1
                     
-            except PermissionError:
-                print(f"Skipped (Permission Denied): {source_path}")
-                counters['errors'] += 1
-            except Exception as e:
-                print(f"Error moving {source_path}: {e}")
-                counters['errors'] += 1
+                except PermissionError:
+                    output.append(f"Skipped (Permission Denied): {source_path}")
+                    counters['errors'] += 1
+                except Exception as e:
+                    output.append(f"Error moving {source_path}: {e}")
+                    counters['errors'] += 1
+
+                if len(output) >= OUTPUT_BATCH:
+                    flush_output()
+    finally:
+        # Also on Ctrl+C, so every completed move is reported
+        flush_output()
 
     print("-" * 50)
     print("Operation complete.")
@@ -3,13 +3,22 @@ import argparse
 import sys
 from collections import defaultdict
 
+from fs_helpers import split_ext, walk_parallel
+
+# Common system directories to skip (lower-case names; dot folders are skipped too)
+SKIP_DIRS = frozenset({
+    'windows', 'program files', 'program files (x86)', '$recycle.bin',
+    'system volume information', 'appdata', '.git', '.vs', '__pycache__',
+    'auto back up', 'autobackup'
+})
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
 def format_size(size_bytes):
     """Formats bytes into human readable string."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} TB"
+    # Unit index straight from the bit length (every 10 bits is one 1024 step)
+    unit = min(((size_bytes | 1).bit_length() - 1) // 10, 4)
+    return f"{size_bytes / (1 << unit * 10):.2f} {SIZE_UNITS[unit]}"
 
 def analyze_extensions(source_dir):
     """
@@ -30,25 +39,17 @@ def analyze_extensions(source_dir):
     total_files = 0
     total_bytes = 0
     
-    # Common system directories to skip
-    SKIP_DIRS = {
-        'windows', 'program files', 'program files (x86)', '$recycle.bin', 
-        'system volume information', 'appdata', '.git', '.vs', '__pycache__',
-        'auto back up', 'autobackup'
-    }
-
-    for root, dirs, files in os.walk(source_dir):
-        # Prune skip dirs
-        dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS and not d.startswith('.')]
-        
-        for file in files:
-            name, ext = os.path.splitext(file)
-            ext_lower = ext.lower()
+    # Prune skip dirs
+    skip_dir = lambda entry: entry.name[:1] == '.' or entry.name.lower() in SKIP_DIRS
+    for root, entries in walk_parallel(source_dir, skip_dir, stat_files=True):
+        for entry in entries:
+            file = entry.name
+            ext_lower = split_ext(file)[1].lower()
             if not ext_lower:
                 ext_lower = "[No Extension]"
             
             try:
-                size = os.path.getsize(os.path.join(root, file))
+                size = entry.stat().st_size
                 ext_counts[ext_lower] += 1
                 ext_size[ext_lower] += size
                 
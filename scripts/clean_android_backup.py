@@ -1,25 +1,41 @@
 import argparse
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import re
-from pathlib import Path
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from fs_helpers import walk_parallel
+
 # ================= CONFIGURATION =================
 
 # Explicit cache / junk extensions (safe to delete)
-TARGET_EXTENSIONS = {
+TARGET_EXTENSIONS = frozenset({
     '.chck', '.checked', '.irszz9', '.pcm', '.exo',
     '.tmp', '.log', '.cfg', '.ini', '.dat', '.m',
     '.swatch', '.pba', '.cxf', '.bf2', '.fsh', '.exi'
-}
+})
 
 # Extensions that must NEVER be deleted (real user data)
-SAFE_EXTENSIONS = {
+SAFE_EXTENSIONS = frozenset({
     '.doc', '.docx', '.pptx', '.xlsx', '.rtf', '.txt', '.epub',
     '.jpg', '.jpeg', '.png', '.bmp', '.tif',
     '.mp4', '.mkv', '.avi', '.flv',
     '.opus', '.amr', '.3ga', '.raw',
     '.apk', '.json', '.html', '.htm', '.js', '.css', '.pb'
+})
+
+# Both sets as one suffix -> action table, so a file needs a single dict lookup;
+# SAFE_EXTENSIONS goes last so it wins should a suffix ever be in both
+KEEP, DELETE = 'keep', 'delete'
+EXTENSION_ACTIONS = {
+    **{ext: DELETE for ext in TARGET_EXTENSIONS},
+    **{ext: KEEP for ext in SAFE_EXTENSIONS},
 }
 
 # WhatsApp encrypted backups (NOW SAFE TO DELETE)
@@ -37,6 +53,27 @@ NO_EXT_CACHE_PATTERNS = [
     re.compile(r'^[a-f0-9]{10,}$', re.I),     # hash-like
 ]
 
+# Each list above as one alternation, so a name needs a single match() call.
+# Alternatives are tried in list order, so the first matching pattern wins as before;
+# lastindex tells which no-ext pattern matched (none of them has groups of its own).
+# The patterns are plain ASCII, so re.ASCII gives the same matches with cheaper
+# case folding than Unicode IGNORECASE.
+WHATSAPP_DELETE_RE = re.compile(
+    '|'.join(f'(?:{p.pattern})' for p in WHATSAPP_DELETE_PATTERNS), re.IGNORECASE | re.ASCII
+)
+NO_EXT_CACHE_RE = re.compile(
+    '|'.join(f'({p.pattern})' for p in NO_EXT_CACHE_PATTERNS), re.IGNORECASE | re.ASCII
+)
+
+# --delete unlinks victims in per-folder batches of up to UNLINK_BATCH names,
+# UNLINK_WORKERS batches at a time, so deletes overlap the rest of the walk
+UNLINK_BATCH = 128
+UNLINK_WORKERS = 4
+
+# Dry-run rows are written straight to stderr (where logging's StreamHandler
+# prints) DRY_RUN_BATCH at a time instead of one logging record per file
+DRY_RUN_BATCH = 512
+
 # ================= LOGGING =================
 
 def setup_logging(dry_run: bool):
@@ -45,7 +82,15 @@ def setup_logging(dry_run: bool):
 
     handlers = [logging.StreamHandler()]
     if not dry_run:
-        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        # The log file is written by a QueueListener thread, so the scan only
+        # enqueues records instead of waiting on a locked write per file
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, logging.FileHandler(log_file, encoding="utf-8")
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        handlers.append(logging.handlers.QueueHandler(log_queue))
 
     logging.basicConfig(
         level=logging.INFO,
@@ -54,93 +99,188 @@ def setup_logging(dry_run: bool):
     )
     return log_file
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
 def format_size(b):
-    for u in ["B", "KB", "MB", "GB"]:
-        if b < 1024:
-            return f"{b:.2f} {u}"
-        b /= 1024
-    return f"{b:.2f} TB"
+    # Unit index straight from the bit length (every 10 bits is one 1024 step)
+    u = min(((b | 1).bit_length() - 1) // 10, 4)
+    return f"{b / (1 << u * 10):.2f} {SIZE_UNITS[u]}"
 
 # ================= HELPERS =================
 
-def is_whatsapp_backup(path: Path) -> bool:
-    return any(p.match(path.name) for p in WHATSAPP_DELETE_PATTERNS)
+def iter_files(root: str):
+    """
+    Yields an os.DirEntry for every file below root (like rglob, symlinked
+    directories aren't followed). Each folder's files come out together.
+    """
+    for _, entries in walk_parallel(root):
+        yield from entries
+
+def file_suffix(name: str) -> str:
+    """Same result as Path(name).suffix without building a Path."""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
 
-def is_no_media_no_ext(path: Path):
+def is_whatsapp_backup(name: str) -> bool:
+    return WHATSAPP_DELETE_RE.match(name) is not None
+
+def is_no_media_no_ext(name: str, size: int):
     """
     OnePlus-specific no-media detection:
     - No extension
     - Numeric / hash / thumbdata / dot-prefixed names
     - Any size (cache blobs can be very large)
     """
-    name = path.name
-    size = path.stat().st_size
 
     # Zero-byte junk
     if size == 0:
         return True, "Zero-byte cache"
 
-    for pat in NO_EXT_CACHE_PATTERNS:
-        if pat.match(name):
-            return True, f"Cache pattern: {pat.pattern}"
+    m = NO_EXT_CACHE_RE.match(name)
+    if m:
+        return True, f"Cache pattern: {NO_EXT_CACHE_PATTERNS[m.lastindex - 1].pattern}"
 
     return False, "Not cache"
 
+def unlink_batch(folder: str, names: list) -> list:
+    """
+    Deletes names from folder, relative to one open folder fd (unlinkat)
+    where the OS supports it. Returns an exception or None per name.
+    """
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd:
+        try:
+            dir_fd = os.open(folder, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        except OSError:
+            dir_fd = None
+
+    errors = []
+    try:
+        for name in names:
+            try:
+                if dir_fd is not None:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    os.unlink(os.path.join(folder, name))
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    return errors
+
 # ================= CORE =================
 
 def scan_and_clean(root_path: str, dry_run: bool):
-    root = Path(root_path)
-    if not root.exists():
+    # Plain str paths from here on: no Path object per file
+    root = os.path.normpath(root_path)
+    if not os.path.exists(root):
         logging.error(f"Invalid path: {root}")
         return
 
     deleted = 0
     reclaimed = 0
 
+    # --delete: victims of the current folder, and submitted batches awaiting their log lines
+    executor = None if dry_run else ThreadPoolExecutor(max_workers=UNLINK_WORKERS)
+    batch_folder = None
+    batch = []  # (name, size, reason)
+    submitted = deque()  # (folder, batch, future)
+
+    def submit_batch():
+        nonlocal batch
+        if batch:
+            names = [name for name, _, _ in batch]
+            submitted.append((batch_folder, batch, executor.submit(unlink_batch, batch_folder, names)))
+            batch = []
+
+    def report_oldest():
+        nonlocal deleted, reclaimed
+        folder, items, future = submitted.popleft()
+        for (name, size, reason), error in zip(items, future.result()):
+            path = os.path.join(folder, name)
+            if error is None:
+                deleted += 1
+                reclaimed += size
+                logging.info(f"Deleted: {path} ({format_size(size)}) [{reason}]")
+            else:
+                logging.error(f"Failed to delete {path}: {error}")
+
+    rows = []  # dry run: formatted lines not yet written
+
+    def flush_rows():
+        if rows:
+            sys.stderr.write("".join(rows))
+            sys.stderr.flush()
+            rows.clear()
+
     if dry_run:
         logging.info("--- DRY RUN (NO FILES DELETED) ---")
         logging.info(f"{'PATH':<70} | {'SIZE':<10} | REASON")
         logging.info("-" * 110)
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-
-        suffix = path.suffix.lower()
-        size = path.stat().st_size
+    for entry in iter_files(root):
+        name = entry.name
+        suffix = file_suffix(name).lower()
+        action = EXTENSION_ACTIONS.get(suffix)
+        size = None  # stat()ed only for files that get this far
 
         # --- DELETE WhatsApp encrypted backups ---
-        if is_whatsapp_backup(path):
+        if is_whatsapp_backup(name):
             reason = "WhatsApp encrypted backup"
 
         # --- Protect real user data ---
-        elif suffix in SAFE_EXTENSIONS:
+        elif action is KEEP:
             continue
 
         # --- Explicit cache extensions ---
-        elif suffix in TARGET_EXTENSIONS:
+        elif action is DELETE:
             reason = f"Cache ext {suffix}"
 
         # --- No-extension OnePlus cache ---
         elif suffix == "":
-            is_cache, reason = is_no_media_no_ext(path)
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            is_cache, reason = is_no_media_no_ext(name, size)
             if not is_cache:
                 continue
 
         else:
             continue
 
+        if size is None:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+
         # ACTION
         if dry_run:
-            logging.info(f"{str(path):<70} | {format_size(size):<10} | {reason}")
+            rows.append(f"{entry.path:<70} | {format_size(size):<10} | {reason}\n")
+            if len(rows) >= DRY_RUN_BATCH:
+                flush_rows()
         else:
-            try:
-                path.unlink()
-                deleted += 1
-                reclaimed += size
-                logging.info(f"Deleted: {path} ({format_size(size)}) [{reason}]")
-            except Exception as e:
-                logging.error(f"Failed to delete {path}: {e}")
+            # iter_files lists one folder at a time, so a new folder ends the batch
+            folder = os.path.dirname(entry.path)
+            if folder != batch_folder or len(batch) >= UNLINK_BATCH:
+                submit_batch()
+                batch_folder = folder
+            batch.append((name, size, reason))
+            while len(submitted) > UNLINK_WORKERS * 2:
+                report_oldest()
+
+    if dry_run:
+        flush_rows()
+    else:
+        submit_batch()
+        while submitted:
+            report_oldest()
+        executor.shutdown()
 
     logging.info("-" * 60)
     if dry_run:
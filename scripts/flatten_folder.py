@@ -1,20 +1,7 @@
 import os
 import shutil
 
-def get_unique_filename(directory, filename):
-    """
-    Generates a unique filename if the file already exists in the destination.
-    Appends _1, _2, etc. to the filename.
-    """
-    name, ext = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(directory, new_filename)):
-        new_filename = f"{name}_{counter}{ext}"
-        counter += 1
-        
-    return new_filename
+from fs_helpers import DestIndex
 
 def flatten_directory(parent_folder):
     """
@@ -27,6 +14,7 @@ def flatten_directory(parent_folder):
 
     print(f"Flattening directory: {parent_folder}")
     files_moved = 0
+    dest_index = DestIndex(parent_folder)
     
     # Walk top-down so we see files before folders
     # We will encounter subdirs. We want to move files from them.
@@ -45,7 +33,7 @@ def flatten_directory(parent_folder):
             source_path = os.path.join(root, file)
             
             # Determine destination
-            destination_filename = get_unique_filename(parent_folder, file)
+            destination_filename = dest_index.reserve(file)
             destination_path = os.path.join(parent_folder, destination_filename)
             
             try:
@@ -0,0 +1,139 @@
+"""
+Filesystem helpers shared by the standalone scripts. Scripts in this folder
+import it as a sibling module (run them as `python scripts/<name>.py`);
+organize_mobile_media.py at the repo root imports it as scripts.fs_helpers.
+"""
+import os
+import errno
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+def split_ext(filename):
+    """os.path.splitext for a bare file name, skipping its separator handling."""
+    i = filename.rfind('.')
+    # Leading dots don't start an extension (".nomedia" has none), as in splitext
+    if i > 0 and (filename[0] != '.' or filename[:i].lstrip('.')):
+        return filename[:i], filename[i:]
+    return filename, ''
+
+class DestIndex:
+    """
+    Names in one destination folder, listed once with os.scandir.
+    Unique names (_1, _2, etc. appended) are picked from this snapshot instead
+    of probing the disk per candidate; the pick is confirmed with one exists()
+    check. Names are compared with os.path.normcase (case-insensitive on Windows).
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        with os.scandir(directory) as it:
+            self.names = {os.path.normcase(entry.name) for entry in it}
+
+    def __contains__(self, filename):
+        return os.path.normcase(filename) in self.names
+
+    def reserve(self, filename):
+        """Returns a free name for filename in the folder and marks it as taken."""
+        name, ext = split_ext(filename)
+        counter = 1
+        candidate = filename
+        while True:
+            key = os.path.normcase(candidate)
+            if key not in self.names:
+                if not os.path.exists(os.path.join(self.directory, candidate)):
+                    break
+                self.names.add(key)
+            candidate = f"{name}_{counter}{ext}"
+            counter += 1
+        self.names.add(key)
+        return candidate
+
+def copy_file(src, dst):
+    """
+    Copies src's data to dst with os.copy_file_range where available (Linux:
+    the copy stays in the kernel and may be a reflink on btrfs/XFS), else
+    shutil.copyfileobj. Permission bits and timestamps are copied like
+    shutil.copy2.
+    """
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError as e:
+                # Older kernels / filesystems without support: finish in user space
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        # Also picks up anything appended since the fstat
+        shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+def move_file(src, dst, same_fs):
+    """
+    Moves src to dst: one rename on the same filesystem, otherwise copy_file
+    then unlink. Symlinks are left to shutil.move.
+    """
+    if same_fs:
+        try:
+            os.replace(src, dst)
+            return
+        except OSError as e:
+            # A mount point inside the source tree
+            if e.errno != errno.EXDEV:
+                raise
+    if os.path.islink(src):
+        shutil.move(src, dst)
+        return
+    copy_file(src, dst)
+    os.unlink(src)
+
+# Folders listed concurrently by walk_parallel
+SCAN_WORKERS = 8
+
+def walk_parallel(root, skip_dir=None, stat_files=False, workers=SCAN_WORKERS):
+    """
+    Yields (folder, file DirEntries) for every folder below root, like
+    os.walk, but lists up to `workers` folders at once on a thread pool
+    (scandir/stat release the GIL, so listings overlap). Folders come out in
+    completion order. skip_dir(entry) returning True prunes a subfolder;
+    symlinked folders are not followed. With stat_files (True, or a
+    predicate on the DirEntry), each (matching) file's stat() is done, and
+    cached on its DirEntry, by the pool too.
+    """
+    if stat_files is True:
+        stat_files = lambda entry: True
+    def list_folder(path):
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if skip_dir is None or not skip_dir(entry):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            if stat_files and stat_files(entry):
+                                entry.stat()
+                            files.append(entry)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return path, files, subdirs
+
+    pending = deque([root])
+    running = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            while pending and len(running) < workers:
+                running.add(executor.submit(list_folder, pending.popleft()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, files, subdirs = future.result()
+                pending.extend(subdirs)
+                yield path, files
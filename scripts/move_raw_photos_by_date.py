@@ -1,30 +1,46 @@
 import os
-import shutil
+import errno
+import hashlib
 import argparse
 import sys
 from datetime import datetime
 
-def get_unique_filename(directory, filename):
+from fs_helpers import split_ext, DestIndex, move_file, walk_parallel
+
+# Bytes read from each end of a file by quick_hash
+QUICK_HASH_BYTES = 4096
+
+# Common system directories to skip (lower-case names; dot folders are skipped too)
+SKIP_DIRS = frozenset({
+    'windows', 'program files', 'program files (x86)', '$recycle.bin',
+    'system volume information', 'appdata', '.git', '.vs', '__pycache__',
+    'auto back up', 'autobackup'
+})
+
+def open_dir_fd(path):
+    """Opens a folder for the *at() calls (renameat, fstatat) made relative to it."""
+    return os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+
+def quick_hash(path, size):
     """
-    Generates a unique filename if the file already exists in the destination.
-    Appends _1, _2, etc. to the filename.
+    Hash of the first and last QUICK_HASH_BYTES of a file: two small reads
+    that tell a same-name, same-size file apart from a real earlier copy.
     """
-    name, ext = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(directory, new_filename)):
-        new_filename = f"{name}_{counter}{ext}"
-        counter += 1
-        
-    return new_filename
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb', buffering=0) as f:
+        h.update(f.read(QUICK_HASH_BYTES))
+        if size > QUICK_HASH_BYTES:
+            f.seek(max(size - QUICK_HASH_BYTES, QUICK_HASH_BYTES))
+            h.update(f.read(QUICK_HASH_BYTES))
+    return h.digest()
 
 def get_date_taken(path):
     """
     Attempts to get the date taken from the file's modification time.
+    path may be an os.DirEntry, whose stat() is cached for later use.
     """
     try:
-        stats = os.stat(path)
+        stats = path.stat() if isinstance(path, os.DirEntry) else os.stat(path)
         timestamp = min(stats.st_ctime, stats.st_mtime)
         return datetime.fromtimestamp(timestamp)
     except Exception:
@@ -48,6 +64,13 @@ def move_sorted_raw_photos(source_dir, dest_base_dir):
     # Normalize paths
     source_dir = os.path.abspath(source_dir)
     dest_base_dir = os.path.abspath(dest_base_dir)
+    # Both paths are absolute, so "inside the destination" is a prefix test
+    dest_key = os.path.normcase(dest_base_dir)
+    dest_prefix = os.path.join(dest_key, '')
+
+    # Same filesystem: a move is a single rename(2), see move_file
+    os.makedirs(dest_base_dir, exist_ok=True)
+    same_fs = os.stat(source_dir).st_dev == os.stat(dest_base_dir).st_dev
 
     print(f"Scanning: {source_dir}")
     print(f"MOVING to: {dest_base_dir}")
@@ -57,58 +80,89 @@ def move_sorted_raw_photos(source_dir, dest_base_dir):
     files_moved = 0
     files_skipped = 0
     errors = 0
+    dest_indexes = {}  # month folder -> DestIndex
+
+    # On one filesystem, renames are renameat() calls relative to open source
+    # and month folder fds, so the kernel doesn't resolve both full paths again
+    # per file (where os.rename takes dir fds; plain paths otherwise)
+    use_dir_fds = same_fs and os.rename in os.supports_dir_fd
+    dest_fds = {}  # month folder -> open fd
     
     RAW_EXTENSIONS_LOWER = {ext.lower() for ext in RAW_EXTENSIONS}
     
-    # Common system directories to skip
-    SKIP_DIRS = {
-        'windows', 'program files', 'program files (x86)', '$recycle.bin', 
-        'system volume information', 'appdata', '.git', '.vs', '__pycache__',
-        'auto back up', 'autobackup'
-    }
-
-    # Walk topdown=True to skip dirs easily
-    for root, dirs, files in os.walk(source_dir, topdown=True):
-        dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS and not d.startswith('.')]
-        
-        if os.path.commonpath([dest_base_dir, root]) == dest_base_dir:
-            continue
+    # The destination is pruned from the walk (so nothing inside it is listed);
+    # if the source itself lies inside the destination there is nothing to do
+    source_key = os.path.normcase(source_dir)
+    inside_dest = source_key == dest_key or source_key.startswith(dest_prefix)
+    skip_dir = lambda entry: (entry.name[:1] == '.' or entry.name.lower() in SKIP_DIRS
+                              or os.path.normcase(entry.path) == dest_key)
+    # RAW files are stat()ed (for get_date_taken) on the walk's pool, so the
+    # stats overlap the listing instead of running one by one in this loop
+    is_raw = lambda entry: split_ext(entry.name)[1].lower() in RAW_EXTENSIONS_LOWER
+    for root, entries in (() if inside_dest else walk_parallel(source_dir, skip_dir, stat_files=is_raw)):
 
-        for file in files:
-            name, ext = os.path.splitext(file)
-            if ext.lower() in RAW_EXTENSIONS_LOWER:
+        src_fd = None  # opened on the folder's first move
+        for entry in entries:
+            file = entry.name
+            if split_ext(file)[1].lower() in RAW_EXTENSIONS_LOWER:
                 source_path = os.path.join(root, file)
                 
                 try:
-                    date_obj = get_date_taken(source_path)
+                    date_obj = get_date_taken(entry)
                     folder_name = date_obj.strftime("%Y-%m")
                     target_dir = os.path.join(dest_base_dir, folder_name)
                     
-                    if not os.path.exists(target_dir):
-                        os.makedirs(target_dir)
+                    dest_index = dest_indexes.get(target_dir)
+                    if dest_index is None:
+                        os.makedirs(target_dir, exist_ok=True)
+                        dest_index = dest_indexes[target_dir] = DestIndex(target_dir)
+                        if use_dir_fds:
+                            dest_fds[target_dir] = open_dir_fd(target_dir)
 
                     target_filename = file 
                     target_path = os.path.join(target_dir, target_filename)
 
                     # Check for existence (Collision handling)
-                    if os.path.exists(target_path):
+                    if file in dest_index:
                         # File with same name exists in correct month folder.
-                        # Check if it's likely the same file (size check)
-                        src_size = os.path.getsize(source_path)
-                        dest_size = os.path.getsize(target_path)
+                        # Check if it's likely the same file (size, then a hash of
+                        # both ends); the source size comes from the stat cached on its DirEntry
+                        try:
+                            if use_dir_fds:
+                                dest_size = os.stat(file, dir_fd=dest_fds[target_dir]).st_size
+                            else:
+                                dest_size = os.stat(target_path).st_size
+                        except FileNotFoundError:
+                            dest_size = None
                         
-                        if src_size == dest_size:
+                        size = entry.stat().st_size
+                        if dest_size == size and quick_hash(source_path, size) == quick_hash(target_path, size):
                             # Likely already copied. Skip move.
                             print(f"Skipped (Already exists): {file} -> {target_path}")
                             files_skipped += 1
                             continue
                         else:
-                            # Name collision but different file size -> Rename and Move
-                            target_filename = get_unique_filename(target_dir, file)
+                            # Name collision but different file -> Rename and Move
+                            target_filename = dest_index.reserve(file)
                             target_path = os.path.join(target_dir, target_filename)
+                    else:
+                        target_filename = dest_index.reserve(file)
+                        target_path = os.path.join(target_dir, target_filename)
 
                     # MOVE
-                    shutil.move(source_path, target_path)
+                    if use_dir_fds:
+                        if src_fd is None:
+                            src_fd = open_dir_fd(root)
+                        try:
+                            os.replace(file, target_filename, src_dir_fd=src_fd,
+                                       dst_dir_fd=dest_fds[target_dir])
+                        except OSError as e:
+                            # A mount point inside the source tree
+                            if e.errno != errno.EXDEV:
+                                raise
+                            move_file(source_path, target_path, False)
+                    else:
+                        move_file(source_path, target_path, same_fs)
                     print(f"Moved: {file} -> {folder_name}\\{target_filename}")
                     files_moved += 1
                     
@@ -119,6 +173,12 @@ def move_sorted_raw_photos(source_dir, dest_base_dir):
                     print(f"Error moving {source_path}: {e}")
                     errors += 1
 
+        if src_fd is not None:
+            os.close(src_fd)
+
+    for fd in dest_fds.values():
+        os.close(fd)
+
     print("-" * 50)
     print("Operation complete.")
     print(f"Total RAW photos moved: {files_moved}")
@@ -143,7 +203,7 @@ if __name__ == "__main__":
         move_sorted_raw_photos(s_dir, d_dir)
     else:
         print("RAW Photo Organizer (MOVE & Sort by Date)")
-        print("NOTE: Any files already present in the destination (same name & size) will be skipped (left in source).")
+        print("NOTE: Any files already present in the destination (same name, size & quick hash) will be skipped (left in source).")
         
         s_input = input(f"Enter Source Directory [Default: {default_source}]: ").strip().replace('"', '')
         s_dir = s_input if s_input else default_source
@@ -1,22 +1,15 @@
 import os
-import shutil
 import argparse
 import sys
 
-def get_unique_filename(directory, filename):
-    """
-    Generates a unique filename if the file already exists in the destination.
-    Appends _1, _2, etc. to the filename.
-    """
-    name, ext = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(directory, new_filename)):
-        new_filename = f"{name}_{counter}{ext}"
-        counter += 1
-        
-    return new_filename
+from fs_helpers import split_ext, DestIndex, move_file, walk_parallel
+
+# Common system directories to skip (lower-case names; dot folders are skipped too)
+SKIP_DIRS = frozenset({
+    'windows', 'program files', 'program files (x86)', '$recycle.bin',
+    'system volume information', 'appdata', '.git', '.vs', '__pycache__',
+    'auto back up', 'autobackup'
+})
 
 def organize_files(source_dir, dest_base_dir):
     """
@@ -35,6 +28,13 @@ def organize_files(source_dir, dest_base_dir):
     # Normalize paths
     source_dir = os.path.abspath(source_dir)
     dest_base_dir = os.path.abspath(dest_base_dir)
+    # Both paths are absolute, so "inside the destination" is a prefix test
+    dest_key = os.path.normcase(dest_base_dir)
+    dest_prefix = os.path.join(dest_key, '')
+
+    # Same filesystem: a move is a single rename(2), see move_file
+    os.makedirs(dest_base_dir, exist_ok=True)
+    same_fs = os.stat(source_dir).st_dev == os.stat(dest_base_dir).st_dev
 
     print(f"Scanning: {source_dir}")
     print(f"Organizing into: {dest_base_dir}")
@@ -42,25 +42,19 @@ def organize_files(source_dir, dest_base_dir):
     
     metrics = {cat: 0 for cat in FILE_CATEGORIES}
     errors = 0
+    dest_indexes = {}  # category folder -> DestIndex
     
-    # Common system directories to skip
-    SKIP_DIRS = {
-        'windows', 'program files', 'program files (x86)', '$recycle.bin', 
-        'system volume information', 'appdata', '.git', '.vs', '__pycache__',
-        'auto back up', 'autobackup'
-    }
-
-    for root, dirs, files in os.walk(source_dir, topdown=True):
-        # Modify dirs in-place to skip system directories
-        dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS and not d.startswith('.')]
-        
-        # Skip if we are inside the destination folder to avoid loops
-        if os.path.commonpath([dest_base_dir, root]) == dest_base_dir:
-            continue
+    # The destination is pruned from the walk (so nothing inside it is listed);
+    # if the source itself lies inside the destination there is nothing to do
+    source_key = os.path.normcase(source_dir)
+    inside_dest = source_key == dest_key or source_key.startswith(dest_prefix)
+    skip_dir = lambda entry: (entry.name[:1] == '.' or entry.name.lower() in SKIP_DIRS
+                              or os.path.normcase(entry.path) == dest_key)
+    for root, entries in (() if inside_dest else walk_parallel(source_dir, skip_dir)):
 
-        for file in files:
-            name, ext = os.path.splitext(file)
-            ext_lower = ext.lower()
+        for entry in entries:
+            file = entry.name
+            ext_lower = split_ext(file)[1].lower()
             
             target_category_folder = None
             
@@ -74,9 +68,12 @@ def organize_files(source_dir, dest_base_dir):
                 source_path = os.path.join(root, file)
                 dest_dir = os.path.join(dest_base_dir, target_category_folder)
                 
-                if not os.path.exists(dest_dir):
+                # Each category folder is created and listed once per run
+                dest_index = dest_indexes.get(dest_dir)
+                if dest_index is None:
                     try:
-                        os.makedirs(dest_dir)
+                        os.makedirs(dest_dir, exist_ok=True)
+                        dest_index = dest_indexes[dest_dir] = DestIndex(dest_dir)
                     except OSError as e:
                         print(f"Error creating directory {dest_dir}: {e}")
                         continue
@@ -86,10 +83,10 @@ def organize_files(source_dir, dest_base_dir):
                     continue
 
                 try:
-                    destination_filename = get_unique_filename(dest_dir, file)
+                    destination_filename = dest_index.reserve(file)
                     destination_path = os.path.join(dest_dir, destination_filename)
                     
-                    shutil.move(source_path, destination_path)
+                    move_file(source_path, destination_path, same_fs)
                     print(f"Moved [{target_category_folder}]: {file} -> {destination_filename}")
                     metrics[target_category_folder] += 1
                 except PermissionError: